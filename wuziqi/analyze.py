@@ -0,0 +1,182 @@
+"""批量局面分析：逐行读取局面，用进程池搜索，按输入顺序输出 JSON lines
+
+用法示例:
+    python analyze.py positions.txt --depth 3 --workers 4 > result.jsonl
+    cat positions.txt | python analyze.py - --time 2
+
+每行一个局面，支持两种格式：
+    落子序列    7 7, 7 8, 8 8          （黑先、黑白交替）
+    JSON 对象   {"id": "g1", "moves": [[7, 7], [7, 8]]}
+                {"id": "g2", "board": "...225个 .XO 或 012 字符...", "to_move": 1}
+--size 指定棋盘大小（默认 15，board 字符数随之变为 size*size）。
+board 未给出 to_move 时，黑白子数相等则黑方走棋。
+输出的着法、分数和主要变例都是走棋一方的视角；格式错误的行输出 error 字段。
+输入逐行读取，同时在途的局面不超过 workers 的常数倍，内存占用与文件大小无关。
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from search import iterative_deepening, search_root
+
+BOARD_SIZE = 15
+SYMBOLS = {'.': 0, '0': 0, 'X': 1, 'x': 1, '1': 1, 'O': 2, 'o': 2, '2': 2}
+
+# 工作进程内复用的引擎和搜索预算
+_engine = None
+_budget = None
+
+
+def parse_record(line, size=BOARD_SIZE):
+    """解析一行输入，返回 (id, 走棋方, 棋盘单元列表)；棋盘按行展开为 size*size 个 0/1/2"""
+    line = line.strip()
+    if line.startswith('{'):
+        record = json.loads(line)
+        if 'board' in record:
+            cells = [SYMBOLS[ch] for ch in record['board'] if not ch.isspace()]
+            if len(cells) != size * size:
+                raise ValueError(f"棋盘应有 {size * size} 格")
+            to_move = record.get('to_move')
+            if to_move is None:
+                to_move = 1 if cells.count(1) == cells.count(2) else 2
+            return record.get('id'), to_move, cells
+        moves = record['moves']
+        record_id = record.get('id')
+    else:
+        numbers = [int(x) for x in line.replace(',', ' ').split()]
+        if len(numbers) % 2:
+            raise ValueError("落子坐标个数应为偶数")
+        moves = list(zip(numbers[::2], numbers[1::2]))
+        record_id = None
+
+    cells = [0] * (size * size)
+    for i, (r, c) in enumerate(moves):
+        if not (0 <= r < size and 0 <= c < size) or cells[r * size + c]:
+            raise ValueError(f"第 {i + 1} 步 ({r}, {c}) 不合法")
+        cells[r * size + c] = 1 if i % 2 == 0 else 2
+    return record_id, 1 if len(moves) % 2 == 0 else 2, cells
+
+
+def _init_worker(budget, size=BOARD_SIZE):
+    global _engine, _budget
+    from wenben import TerminalGomoku
+    _engine = TerminalGomoku(size=size)
+    _engine.book = None  # 分析局面本身，不查开局库
+    _budget = budget
+
+
+def analyze(task):
+    """在工作进程中分析一个局面。task = (行号, id, 走棋方, 棋盘单元)"""
+    line_no, record_id, to_move, cells = task
+    game = _engine
+    depth, time_limit, node_limit, search_mode = _budget
+    start = time.perf_counter()
+
+    # 引擎总是以白棋(2)视角搜索，黑方走棋时黑白互换
+    game.reset()
+    for i, player in enumerate(cells):
+        if player:
+            r, c = divmod(i, game.size)
+            game.place_stone(r, c, player if to_move == 2 else 3 - player)
+            if game.check_win(r, c):
+                game.game_over = True
+    game.current_player = 2
+    result = {'line': line_no, 'id': record_id, 'to_move': to_move}
+    if game.game_over:
+        result['error'] = "对局已结束"
+        return result
+
+    game.nodes = 0
+    game.search_mode = search_mode
+    if time_limit is None and node_limit is None:
+        score, move = search_root(game, depth)
+    else:
+        score, move, depth = iterative_deepening(game, game.max_depth, time_limit, node_limit)
+
+    result.update({
+        'move': list(move) if move else None,
+        'score': score,
+        'pv': [list(m) for m in game.pv],
+        'depth': depth,
+        'nodes': game.nodes,
+        'time': round(time.perf_counter() - start, 4),
+    })
+    return result
+
+
+def read_tasks(lines, size=BOARD_SIZE):
+    """逐行生成任务；无法解析的行直接生成错误结果"""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        try:
+            record_id, to_move, cells = parse_record(line, size)
+        except (ValueError, KeyError, TypeError) as e:
+            yield None, {'line': line_no, 'error': str(e)}
+            continue
+        yield (line_no, record_id, to_move, cells), None
+
+
+def run_batch(lines, out, depth=3, time_limit=None, node_limit=None, workers=1,
+              search_mode='alphabeta', window=None, size=BOARD_SIZE):
+    """分析 lines 中的所有局面，按输入顺序把结果逐行写入 out，返回处理的局面数"""
+    budget = (depth, time_limit, node_limit, search_mode)
+    count = 0
+
+    def emit(result):
+        nonlocal count
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        count += 1
+
+    if workers <= 1:
+        _init_worker(budget, size)
+        for task, error in read_tasks(lines, size):
+            emit(error if task is None else analyze(task))
+        return count
+
+    # 有界的在途队列：队首完成后才写出，既保持输入顺序又限制内存
+    window = window or workers * 4
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(budget, size)) as pool:
+        for task, error in read_tasks(lines, size):
+            pending.append(error if task is None else pool.submit(analyze, task))
+            while len(pending) >= window:
+                item = pending.popleft()
+                emit(item if isinstance(item, dict) else item.result())
+        while pending:
+            item = pending.popleft()
+            emit(item if isinstance(item, dict) else item.result())
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="五子棋批量局面分析")
+    parser.add_argument('input', nargs='?', default='-', help="输入文件，- 为标准输入")
+    parser.add_argument('--depth', type=int, default=3, help="固定搜索深度")
+    parser.add_argument('--time', type=float, help="每个局面的时间（秒），使用迭代加深")
+    parser.add_argument('--nodes', type=int, help="每个局面的节点上限，使用迭代加深")
+    parser.add_argument('--workers', type=int, default=1, help="并行进程数")
+    parser.add_argument('--pvs', action='store_true', help="使用主要变例搜索")
+    parser.add_argument('--output', help="结果写入文件（默认标准输出）")
+    parser.add_argument('--size', type=int, default=BOARD_SIZE, help="棋盘大小")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count = run_batch(source, out, args.depth, args.time, args.nodes, args.workers,
+                          'pvs' if args.pvs else 'alphabeta', size=args.size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"已分析 {count} 个局面", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""无界面自对弈擂台：让不同引擎配置互相对局，统计胜负、Elo、思考时间和每秒节点数
+
+用法示例:
+    python arena.py d2:depth=2 d3:depth=3,eval=full --games 20 --workers 4 \\
+        --json result.json --csv result.csv --record arena.gmr
+
+配置格式为 名称:键=值,键=值，可用的键：
+    depth   固定搜索深度        eval    评估方式 incremental/full/vectorized
+    time    每步时间（秒）      nodes   每步节点上限
+    engine  wenben（默认）或 wuziqi
+    search  alphabeta（默认）/pvs/mcts      playouts  MCTS 每步模拟次数
+MCTS 配置的 nodes_per_second 为每秒模拟次数。
+引擎总是以白棋(2)视角搜索，执黑的一方看到的是黑白互换后的棋盘。
+--size 设置所有对局的棋盘大小（默认 15）。
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BOARD_SIZE = 15
+DEFAULT_CONFIG = {'depth': 2, 'eval': 'incremental', 'time': None, 'nodes': None,
+                  'engine': 'wenben', 'search': 'alphabeta', 'playouts': 2000}
+
+
+def parse_config(text):
+    """把 "名称:depth=3,eval=full" 解析为配置字典"""
+    name, _, options = text.partition(':')
+    config = dict(DEFAULT_CONFIG, name=name)
+    for item in filter(None, options.split(',')):
+        key, _, value = item.partition('=')
+        if key not in DEFAULT_CONFIG:
+            raise ValueError(f"未知的配置项: {key}")
+        if key in ('depth', 'nodes', 'playouts'):
+            value = int(value)
+        elif key == 'time':
+            value = float(value)
+        config[key] = value
+    return config
+
+
+def make_engine(config):
+    if config['engine'] == 'wuziqi':
+        from wuziqi import GomokuGame as engine_cls
+    else:
+        from wenben import TerminalGomoku as engine_cls
+    game = engine_cls(size=config.get('size', BOARD_SIZE))
+    game.depth = config['depth']
+    game.eval_mode = config['eval']
+    game.time_limit = config['time']
+    game.node_limit = config['nodes']
+    game.search_mode = config['search']
+    game.mcts_playouts = config['playouts']
+    game.book = None  # 对局评估不使用开局库
+    return game
+
+
+def random_opening(rng, plies, size=BOARD_SIZE):
+    """在中心 5x5 区域内随机落 plies 步作为开局"""
+    center = size // 2
+    cells = [(r, c) for r in range(center - 2, center + 3) for c in range(center - 2, center + 3)]
+    return rng.sample(cells, plies)
+
+
+def play_game(task):
+    """对弈一局。task = (黑方配置, 白方配置, 开局着法)，返回对局记录"""
+    black, white, opening = task
+    engines = {1: make_engine(black), 2: make_engine(white)}
+    size = engines[1].size
+    stats = {1: {'time': 0.0, 'moves': 0, 'nodes': 0}, 2: {'time': 0.0, 'moves': 0, 'nodes': 0}}
+    moves = []
+    winner = None
+    player = 1
+
+    def apply(r, c, player):
+        # 每个引擎都把自己看作白棋(2)
+        for side, game in engines.items():
+            game.current_player = player if side == 2 else 3 - player
+            game.make_move(r, c)
+
+    for r, c in opening:
+        apply(r, c, player)
+        moves.append((r, c))
+        player = 3 - player
+
+    while len(moves) < size * size:
+        game = engines[player]
+        if game.game_over:
+            break
+        if game.mcts is not None:
+            game.mcts.simulations = 0  # 本步由开局或威胁搜索决定时不计上一步的模拟次数
+        start = time.perf_counter()
+        move, _ = game.choose_move()
+        stats[player]['time'] += time.perf_counter() - start
+        stats[player]['moves'] += 1
+        # MCTS 不计节点，以模拟次数代替（nodes_per_second 即每秒模拟次数）
+        if game.search_mode == 'mcts' and game.mcts is not None:
+            stats[player]['nodes'] += game.mcts.simulations
+        else:
+            stats[player]['nodes'] += game.nodes
+        if move is None:
+            break
+        r, c = move
+        apply(r, c, player)
+        moves.append((r, c))
+        if game.game_over:
+            winner = player if game.winner is not None else None
+            break
+        player = 3 - player
+
+    return {
+        'black': black['name'],
+        'white': white['name'],
+        'winner': {1: black['name'], 2: white['name']}.get(winner),
+        'moves': moves,
+        'stats': {black['name']: stats[1], white['name']: stats[2]},
+    }
+
+
+def schedule(configs, games, opening_plies, seed, size=BOARD_SIZE):
+    """循环赛：每对配置用同一开局各执黑一次"""
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in itertools.combinations(configs, 2):
+        for i in range(games):
+            opening = random_opening(rng, opening_plies, size)
+            tasks.append((a, b, opening) if i % 2 == 0 else (b, a, opening))
+    return tasks
+
+
+def elo_from_score(score):
+    """由得分率估计相对于对手平均水平的 Elo 差"""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(configs, records):
+    summary = {}
+    for config in configs:
+        summary[config['name']] = {'name': config['name'], 'wins': 0, 'draws': 0, 'losses': 0,
+                                   'think_time': 0.0, 'moves': 0, 'nodes': 0}
+    for record in records:
+        for name in (record['black'], record['white']):
+            row = summary[name]
+            if record['winner'] is None:
+                row['draws'] += 1
+            elif record['winner'] == name:
+                row['wins'] += 1
+            else:
+                row['losses'] += 1
+            s = record['stats'][name]
+            row['think_time'] += s['time']
+            row['moves'] += s['moves']
+            row['nodes'] += s['nodes']
+
+    rows = []
+    for row in summary.values():
+        games = row['wins'] + row['draws'] + row['losses']
+        score = (row['wins'] + 0.5 * row['draws']) / games if games else 0.5
+        rows.append({
+            'name': row['name'],
+            'games': games,
+            'wins': row['wins'],
+            'draws': row['draws'],
+            'losses': row['losses'],
+            'score': round(score, 3),
+            'elo': round(elo_from_score(score), 1),
+            'avg_think_time': round(row['think_time'] / row['moves'], 4) if row['moves'] else 0.0,
+            'nodes_per_second': round(row['nodes'] / row['think_time']) if row['think_time'] else 0,
+        })
+    return rows
+
+
+def run_arena(configs, games=10, opening_plies=2, workers=1, seed=0, size=BOARD_SIZE):
+    configs = [dict(config, size=size) for config in configs]
+    tasks = schedule(configs, games, opening_plies, seed, size)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(play_game, tasks))
+    else:
+        records = [play_game(task) for task in tasks]
+    return summarize(configs, records), records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="五子棋引擎自对弈擂台")
+    parser.add_argument('configs', nargs='+', help="引擎配置，如 d3:depth=3,eval=full")
+    parser.add_argument('--games', type=int, default=10, help="每对配置的对局数")
+    parser.add_argument('--opening', type=int, default=2, help="随机开局步数")
+    parser.add_argument('--workers', type=int, default=1, help="并行进程数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=BOARD_SIZE, help="棋盘大小")
+    parser.add_argument('--json', help="结果写入 JSON 文件")
+    parser.add_argument('--csv', help="结果写入 CSV 文件")
+    parser.add_argument('--record', help="对局着法追加写入记录文件（records.py 格式）")
+    args = parser.parse_args()
+
+    configs = [parse_config(text) for text in args.configs]
+    if len(configs) < 2:
+        parser.error("至少需要两个引擎配置")
+    rows, records = run_arena(configs, args.games, args.opening, args.workers, args.seed, args.size)
+
+    print(json.dumps(rows, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'summary': rows, 'games': records}, f, ensure_ascii=False, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.record:
+        from records import GameRecordWriter
+        with GameRecordWriter(args.record, args.size) as recorder:
+            for record in records:
+                winner = {record['black']: 1, record['white']: 2}.get(record['winner'], 0)
+                recorder.write(record['moves'], winner)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""搜索性能对比：在固定局面集上比较不同搜索配置的节点数和耗时
+
+用法: python bench.py {board,history,ordering,parallel,pvs,size} [--depth 3] [--workers 4]
+"""
+import argparse
+import time
+
+from search import iterative_deepening, search_root
+from wenben import TerminalGomoku
+
+# 参考局面（落子序列，黑白交替，黑先）
+REFERENCE_POSITIONS = [
+    [(7, 7), (7, 8), (8, 8), (6, 6)],
+    [(7, 7), (8, 8), (7, 8), (6, 6), (7, 6), (7, 9)],
+    [(7, 7), (6, 8), (8, 6), (8, 8), (6, 6), (9, 9), (5, 5)],
+    [(7, 7), (7, 6), (8, 7), (6, 7), (9, 7), (10, 7), (8, 8), (8, 6)],
+    [(6, 7), (7, 7), (6, 8), (7, 8), (6, 6), (7, 6), (5, 5)],
+    [(7, 7), (8, 7), (7, 8), (8, 8), (7, 9), (8, 9), (9, 6), (6, 10), (5, 9)],
+]
+
+
+def setup_position(moves, **kwargs):
+    game = TerminalGomoku(**kwargs)
+    for r, c in moves:
+        game.make_move(r, c)
+    # 基准测试统一从AI（白棋）视角搜索
+    game.current_player = 2
+    return game
+
+
+def run_config(name, depth, configure, deepening=False, positions=REFERENCE_POSITIONS, **kwargs):
+    """在所有参考局面上搜索（deepening 时迭代加深到 depth），返回总节点数和总耗时
+
+    kwargs 传给引擎的构造函数。
+    """
+    total_nodes = 0
+    total_time = 0.0
+    for moves in positions:
+        game = setup_position(moves, **kwargs)
+        configure(game)
+        game.nodes = 0
+        start = time.perf_counter()
+        if deepening:
+            iterative_deepening(game, depth)
+        else:
+            search_root(game, depth)
+        total_time += time.perf_counter() - start
+        total_nodes += game.nodes
+    print(f"{name:<24} 节点数: {total_nodes:>9}  耗时: {total_time:7.2f}秒")
+    return total_nodes, total_time
+
+
+def bench_ordering(depth):
+    def plain(game):
+        game.move_ordering = False
+
+    def ordered(game):
+        game.move_ordering = True
+
+    def top8(game):
+        game.move_ordering = True
+        game.top_k = 8
+
+    run_config("无排序", depth, plain)
+    run_config("启发式排序", depth, ordered)
+    run_config("启发式排序 + top_k=8", depth, top8)
+
+
+def bench_parallel(depth, workers=4):
+    """同一深度下串行与根节点并行搜索的耗时对比，并核对两者选出的着法一致"""
+    from parallel import ParallelSearcher
+
+    for n in (1, workers):
+        total_time = 0.0
+        results = []
+        searcher = None
+        for moves in REFERENCE_POSITIONS:
+            game = setup_position(moves)
+            if n > 1 and searcher is None:
+                searcher = ParallelSearcher(game, n)
+            start = time.perf_counter()
+            if searcher is None:
+                results.append(game.minimax(depth, float('-inf'), float('inf'), True))
+            else:
+                results.append(searcher.search(game, depth))
+            total_time += time.perf_counter() - start
+        if searcher is not None:
+            searcher.close()
+        print(f"进程数 {n:<3} 耗时: {total_time:7.2f}秒  着法: {[move for _, move in results]}")
+
+
+def bench_pvs(depth):
+    """α-β 与主要变例搜索的节点数对比，固定深度和迭代加深（渴望窗口）各一组"""
+    def alphabeta(game):
+        game.search_mode = 'alphabeta'
+
+    def pvs(game):
+        game.search_mode = 'pvs'
+
+    run_config("α-β 固定深度", depth, alphabeta)
+    run_config("PVS 固定深度", depth, pvs)
+    run_config("α-β 迭代加深", depth, alphabeta, deepening=True)
+    run_config("PVS 迭代加深 + 渴望窗口", depth, pvs, deepening=True)
+
+
+def bench_history(depth):
+    """有无杀手着法/历史启发表的节点数对比"""
+    def plain(game):
+        game.history = None
+
+    def history(game):
+        pass
+
+    def history_pvs(game):
+        game.search_mode = 'pvs'
+
+    run_config("无杀手/历史表 迭代加深", depth, plain, deepening=True)
+    run_config("杀手/历史表 迭代加深", depth, history, deepening=True)
+    run_config("杀手/历史表 PVS 迭代加深", depth, history_pvs, deepening=True)
+    run_config("无杀手/历史表 固定深度", depth, plain)
+    run_config("杀手/历史表 固定深度", depth, history)
+
+
+def bench_board(depth, repeat=200):
+    """数组棋盘与带哨兵边框的一维棋盘：胜负判断、逐格评估、着法生成的微基准，以及整盘扫描的搜索
+
+    两种模式在每个参考局面上的结果必须完全一致。
+    """
+    def board_ops(game):
+        cells = [(r, c) for r in range(game.size) for c in range(game.size)]
+        stones = [(r, c) for r, c in cells if game.board[r][c]]
+        empties = [(r, c) for r, c in cells if not game.board[r][c]]
+        wins = [game.check_win(r, c) for r, c in stones]
+        scores = [game.evaluate_position(r, c, p) for r, c in empties for p in (1, 2)]
+        return wins, scores, game.get_available_moves()
+
+    results = {}
+    for mode in ('array', 'padded'):
+        games = [setup_position(moves, board_mode=mode, candidate_radius=0)
+                 for moves in REFERENCE_POSITIONS]
+        for game in games:
+            game.use_pattern_table = False
+        start = time.perf_counter()
+        for _ in range(repeat):
+            ops = [board_ops(game) for game in games]
+        elapsed = time.perf_counter() - start
+        results[mode] = ops
+        print(f"{mode:<8} 棋盘操作 x{repeat}  耗时: {elapsed:7.2f}秒")
+
+        def configure(game):
+            game.use_pattern_table = False
+            game.eval_mode = 'full'
+
+        results[mode + '_search'] = run_config(f"{mode} 整盘扫描搜索", depth, configure,
+                                               board_mode=mode, candidate_radius=0)
+    assert results['array'] == results['padded'], "两种棋盘的结果不一致"
+    assert results['array_search'][0] == results['padded_search'][0], "两种棋盘的搜索节点数不一致"
+
+
+def bench_size(depth, sizes=(15, 19, 25)):
+    """参考局面平移到不同大小棋盘的中央后搜索：节点数应相同，每节点耗时不应随棋盘面积增长"""
+    for size in sizes:
+        shift = size // 2 - 7
+        positions = [[(r + shift, c + shift) for r, c in moves] for moves in REFERENCE_POSITIONS]
+        nodes, elapsed = run_config(f"{size}x{size} 迭代加深", depth, lambda game: None,
+                                    deepening=True, positions=positions, size=size)
+        print(f"{'':<24} 每节点: {elapsed / nodes * 1e6:7.1f}微秒")
+
+
+BENCHMARKS = {
+    'board': bench_board,
+    'size': bench_size,
+    'ordering': bench_ordering,
+    'parallel': bench_parallel,
+    'pvs': bench_pvs,
+    'history': bench_history,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="五子棋搜索基准测试")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    if args.benchmark == 'parallel':
+        bench_parallel(args.depth, args.workers)
+    else:
+        BENCHMARKS[args.benchmark](args.depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""五子棋位棋盘：每种颜色一个 Python 整数
+
+第 r 行第 c 列对应第 r * stride + c 位，stride = size + 1，
+每行末尾多留一列恒为0的保护位，这样横向、斜向移位不会跨行串位。
+四个方向的移位量：横 1，竖 stride，左上-右下 stride+1，右上-左下 stride-1。
+"""
+
+
+class BitBoard:
+    def __init__(self, size=15):
+        self.size = size
+        self.stride = size + 1
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+
+        # 所有合法格子的掩码（不含保护列）
+        row = (1 << size) - 1
+        self.full = 0
+        for r in range(size):
+            self.full |= row << (r * self.stride)
+
+        # start_masks[d][bit]：经过该点的五连在方向 d 上可能的起点集合
+        self.start_masks = []
+        for s in self.shifts:
+            masks = [0] * (size * self.stride)
+            for r in range(size):
+                for c in range(size):
+                    p = r * self.stride + c
+                    m = 0
+                    for k in range(5):
+                        if p - k * s >= 0:
+                            m |= 1 << (p - k * s)
+                    masks[p] = m & self.full
+            self.start_masks.append(masks)
+        self.reset()
+
+    def reset(self):
+        self.bits = [0, 0, 0]  # bits[1] 黑棋，bits[2] 白棋
+
+    def load(self, board):
+        self.reset()
+        for r in range(self.size):
+            for c in range(self.size):
+                if board[r][c]:
+                    self.place(r, c, int(board[r][c]))
+
+    def index(self, row, col):
+        return row * self.stride + col
+
+    def place(self, row, col, player):
+        self.bits[player] |= 1 << (row * self.stride + col)
+
+    def remove(self, row, col, player):
+        self.bits[player] &= ~(1 << (row * self.stride + col))
+
+    def occupied(self):
+        return self.bits[1] | self.bits[2]
+
+    def empty(self):
+        return self.full & ~(self.bits[1] | self.bits[2])
+
+    def player_at(self, row, col):
+        bit = 1 << (row * self.stride + col)
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[2] & bit:
+            return 2
+        return 0
+
+    def check_win(self, row, col):
+        """检查经过 (row, col) 的棋子是否构成五连"""
+        player = self.player_at(row, col)
+        if not player:
+            return False
+        x = self.bits[player]
+        p = row * self.stride + col
+        for d, s in enumerate(self.shifts):
+            five = x & (x >> s) & (x >> 2 * s) & (x >> 3 * s) & (x >> 4 * s)
+            if five & self.start_masks[d][p]:
+                return True
+        return False
+
+    def five_points(self, player):
+        """落子即成五的空点（即 player 当前所有“四”的成五点）"""
+        x = self.bits[player]
+        e = self.empty()
+        points = 0
+        for s in self.shifts:
+            x1 = x >> s
+            x2 = x >> 2 * s
+            x3 = x >> 3 * s
+            x4 = x >> 4 * s
+            # 前缀与后缀的按位与，窗口内除第 k 格外都是己方棋子
+            p01 = x & x1
+            p012 = p01 & x2
+            s34 = x3 & x4
+            s234 = x2 & s34
+            points |= (e & x1 & s234)
+            points |= ((e >> s) & x & s234) << s
+            points |= ((e >> 2 * s) & p01 & s34) << 2 * s
+            points |= ((e >> 3 * s) & p012 & x4) << 3 * s
+            points |= ((e >> 4 * s) & p012 & x3) << 4 * s
+        return points & self.full
+
+    def four_points(self, player):
+        """落子后形成“四”（五格窗口内有四子一空）的空点"""
+        x = self.bits[player]
+        e = self.empty()
+        points = 0
+        for s in self.shifts:
+            xs = [x >> (j * s) for j in range(5)]
+            es = [e >> (j * s) for j in range(5)]
+            # 五格窗口中三子两空，两个空位都是成四点
+            for a in range(5):
+                for b in range(a + 1, 5):
+                    w = es[a] & es[b]
+                    for j in range(5):
+                        if j != a and j != b:
+                            w &= xs[j]
+                    points |= (w << (a * s)) | (w << (b * s))
+        return points & self.full
+
+    def open_four_points(self, player):
+        """落子后形成活四（_XXXX_）的空点，即 player 当前活三的成活四点"""
+        x = self.bits[player]
+        e = self.empty()
+        points = 0
+        for s in self.shifts:
+            xs = [x >> (j * s) for j in range(6)]
+            ends = e & (e >> (5 * s))
+            for k in range(1, 5):
+                w = ends & (e >> (k * s))
+                for j in range(1, 5):
+                    if j != k:
+                        w &= xs[j]
+                points |= w << (k * s)
+        return points & self.full
+
+    def three_points(self, player):
+        """落子后形成活三（六格窗口两端为空，中间四格三子一空）的空点"""
+        x = self.bits[player]
+        e = self.empty()
+        points = 0
+        for s in self.shifts:
+            xs = [x >> (j * s) for j in range(6)]
+            es = [e >> (j * s) for j in range(6)]
+            ends = es[0] & es[5]
+            # 中间四格两子两空，两个空位都是成活三点
+            for a in range(1, 5):
+                for b in range(a + 1, 5):
+                    w = ends & es[a] & es[b]
+                    for j in range(1, 5):
+                        if j != a and j != b:
+                            w &= xs[j]
+                    points |= (w << (a * s)) | (w << (b * s))
+        return points & self.full
+
+    def neighbors(self, radius=1):
+        """与已有棋子相距不超过 radius（切比雪夫距离）的空点"""
+        occ = self.occupied()
+        area = occ
+        for _ in range(radius):
+            grown = area | (area << 1) | (area >> 1)
+            grown |= (grown << self.stride) | (grown >> self.stride)
+            area = grown & self.full
+        return area & ~occ
+
+    def iter_points(self, mask):
+        """按行优先顺序枚举掩码中的格子"""
+        stride = self.stride
+        while mask:
+            low = mask & -mask
+            p = low.bit_length() - 1
+            yield divmod(p, stride)
+            mask ^= low
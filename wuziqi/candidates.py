@@ -0,0 +1,59 @@
+"""增量维护的候选着法集合
+
+每个格子记录半径 radius 内（切比雪夫距离，与 wuziqi.c 的 ±2 邻域相同的定义）
+有多少颗棋子；计数大于0的空点就是候选点。落子/撤销只更新邻域内的计数，
+着法生成的代价与候选点数量成正比，而不是整个棋盘。
+"""
+
+
+class CandidateSet:
+    def __init__(self, size=15, radius=1):
+        self.size = size
+        self.radius = radius
+        self.points = [divmod(i, size) for i in range(size * size)]
+        # neighbors[i]：格子 i 半径内的其他格子
+        self.neighbors = []
+        for r in range(size):
+            for c in range(size):
+                self.neighbors.append([
+                    nr * size + nc
+                    for nr in range(max(0, r - radius), min(size, r + radius + 1))
+                    for nc in range(max(0, c - radius), min(size, c + radius + 1))
+                    if (nr, nc) != (r, c)
+                ])
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (self.size * self.size)
+        self.occupied = [False] * (self.size * self.size)
+        self.candidates = set()
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def place(self, row, col):
+        i = row * self.size + col
+        self.occupied[i] = True
+        self.candidates.discard(i)
+        counts = self.counts
+        occupied = self.occupied
+        for j in self.neighbors[i]:
+            counts[j] += 1
+            if not occupied[j]:
+                self.candidates.add(j)
+
+    def remove(self, row, col):
+        i = row * self.size + col
+        self.occupied[i] = False
+        counts = self.counts
+        for j in self.neighbors[i]:
+            counts[j] -= 1
+            if counts[j] == 0:
+                self.candidates.discard(j)
+        if counts[i] > 0:
+            self.candidates.add(i)
+
+    def moves(self):
+        """候选点列表，按行优先顺序（与整盘扫描的顺序一致）"""
+        points = self.points
+        return [points[i] for i in sorted(self.candidates)]
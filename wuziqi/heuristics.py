@@ -0,0 +1,42 @@
+"""杀手着法与历史启发表
+
+搜索中引起 β 剪枝的着法记录在两张表里：每层（距根节点的步数）两个杀手着法槽位，
+以及每种颜色一张棋盘大小的历史分表（按剩余深度的平方累加）。着法排序时启发分加上
+历史分，当前层的杀手着法排在分数最高的着法之后（见 move_order.order_moves）。两次 choose_move 之间只做老化而不清空：历史分减半，
+杀手着法前移两层（对手和自己各走了一步，原来第 2 层的局面成为新的根节点附近）。
+"""
+
+
+class MoveHistory:
+    def __init__(self, size, max_ply=64):
+        self.size = size
+        self.max_ply = max_ply
+        self.clear()
+
+    def clear(self):
+        self.killers = [[None, None] for _ in range(self.max_ply)]
+        self.history = [None] + [[0] * (self.size * self.size) for _ in range(2)]
+
+    def age(self, plies=2):
+        """新一次搜索开始前调用：历史分减半，杀手着法前移 plies 层"""
+        for table in self.history[1:]:
+            for i, value in enumerate(table):
+                if value:
+                    table[i] = value >> 1
+        self.killers = self.killers[plies:] + [[None, None] for _ in range(plies)]
+
+    def record(self, ply, move, player, depth):
+        """着法 move 在第 ply 层、剩余深度 depth 处引起剪枝"""
+        if ply < self.max_ply:
+            slots = self.killers[ply]
+            if slots[0] != move:
+                slots[1] = slots[0]
+                slots[0] = move
+        r, c = move
+        self.history[player][r * self.size + c] += depth * depth
+
+    def killer_moves(self, ply):
+        return self.killers[ply] if ply < self.max_ply else (None, None)
+
+    def scores(self, player):
+        return self.history[player]
@@ -0,0 +1,197 @@
+"""蒙特卡洛树搜索（UCT），着法限制在已有棋子的邻域内
+
+每轮用 UCT 选出一批叶子（被选中的路径先记一次访问作为虚拟损失，使同一批的叶子分散），
+再把这批叶子的局面堆成 (N, size, size) 数组，用 NumPy 同时随机模拟到终局或步数上限，
+最后把胜负回传。树的节点数有上限，达到后只模拟不再扩展。
+走棋后下一次搜索会沿双方实际落下的着法找到对应子树继续使用。
+"""
+import math
+import time
+
+import numpy as np
+
+from batch_board import five_at, mark_neighbours, neighbour_mask, sample_moves
+from move_order import makes_five
+
+
+class Node:
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'visits', 'value', 'winner')
+
+    def __init__(self, move, player, parent):
+        self.move = move        # 进入该节点的着法
+        self.player = player    # 走这步棋的一方，value 按这一方的胜负累计
+        self.parent = parent
+        self.children = []
+        self.untried = None     # 首次扩展时生成
+        self.visits = 0
+        self.value = 0.0
+        self.winner = None      # 该着法直接成五时为 player
+
+
+class MCTS:
+    def __init__(self, size=15, playouts=2000, batch=128, max_nodes=200000,
+                 rollout_plies=40, c=1.4, radius=1, seed=None):
+        self.size = size
+        self.playouts = playouts
+        self.batch = batch
+        self.max_nodes = max_nodes
+        self.rollout_plies = rollout_plies
+        self.c = c
+        self.radius = radius
+        self.rng = np.random.default_rng(seed)
+        self.root = None
+        self.root_board = None
+        self.node_count = 0
+        self.simulations = 0
+
+    def clear(self):
+        self.root = None
+        self.root_board = None
+        self.node_count = 0
+
+    # ---- 子树复用 ----
+
+    def _reroot(self, board, player):
+        """在旧树中沿新增的棋子找到当前局面；找不到时新建根节点"""
+        if self.root is not None and self.root_board.shape == board.shape:
+            changed = self.root_board != board
+            if not (self.root_board[changed] != 0).any():  # 只新增、没有提走棋子
+                added = {(r, c): int(board[r, c]) for r, c in np.argwhere(changed).tolist()}
+                node = self.root
+                while added and node is not None:
+                    node = next((ch for ch in node.children
+                                 if added.get(ch.move) == ch.player), None)
+                    if node is not None:
+                        del added[node.move]
+                if node is not None and 3 - node.player == player:
+                    node.parent = None
+                    self.root = node
+                    self.root_board = board.copy()
+                    self.node_count = self._count(node)
+                    return
+        self.root = Node(None, 3 - player, None)
+        self.root_board = board.copy()
+        self.node_count = 1
+
+    @staticmethod
+    def _count(node):
+        count = 0
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            count += 1
+            stack.extend(n.children)
+        return count
+
+    # ---- 选择与扩展 ----
+
+    def _untried(self, board):
+        mask = neighbour_mask(board[None], self.radius)[0]
+        moves = [tuple(m) for m in np.argwhere(mask).tolist()]
+        self.rng.shuffle(moves)
+        return moves
+
+    def _select(self, board):
+        """从根节点选到一个叶子并扩展一步，board 随之落子；返回路径"""
+        node = self.root
+        path = [node]
+        while node.winner is None:
+            if node.untried is None:
+                node.untried = self._untried(board)
+            if node.untried and self.node_count < self.max_nodes:
+                r, c = node.untried.pop()
+                child = Node((r, c), 3 - node.player, node)
+                board[r, c] = child.player
+                if makes_five(board, r, c, child.player):
+                    child.winner = child.player
+                node.children.append(child)
+                self.node_count += 1
+                path.append(child)
+                return path
+            if not node.children:
+                return path  # 棋盘已满
+            log_n = math.log(max(node.visits, 1))
+            c = self.c
+            node = max(node.children,
+                       key=lambda ch: ch.value / ch.visits + c * math.sqrt(log_n / ch.visits)
+                       if ch.visits else float('inf'))
+            board[node.move] = node.player
+            path.append(node)
+        return path
+
+    # ---- 批量模拟 ----
+
+    def rollout(self, boards, to_move):
+        """从 boards 的各局面同时随机模拟，返回胜方数组（0 为和棋或未分胜负）"""
+        boards = boards.copy()
+        n = len(boards)
+        players = to_move.astype(np.int8).copy()
+        winners = np.zeros(n, dtype=np.int8)
+        active = np.ones(n, dtype=bool)
+        # 邻域掩码随落子增量更新，每步只需与空点求交
+        near = neighbour_mask(boards, self.radius) | (boards != 0)
+        size = self.size
+        for _ in range(self.rollout_plies):
+            idx = np.flatnonzero(active)
+            if len(idx) == 0:
+                break
+            cells, ok = sample_moves(near[idx] & (boards[idx] == 0), self.rng)
+            active[idx[~ok]] = False
+            idx, cells = idx[ok], cells[ok]
+            r, c = np.divmod(cells, size)
+            boards[idx, r, c] = players[idx]
+            mark_neighbours(near, idx, r, c, self.radius)
+            won = idx[five_at(boards, idx, r, c)]
+            winners[won] = players[won]
+            active[won] = False
+            players[idx] = 3 - players[idx]
+        return winners
+
+    # ---- 搜索 ----
+
+    def search(self, board, player, playouts=None, time_limit=None, should_stop=None):
+        """为 player 选择着法，返回 (着法, 本次模拟次数)
+
+        playouts 为 None 时：给定 time_limit 则只受时间限制，否则使用 self.playouts。
+        """
+        board = np.asarray(board, dtype=np.int8)
+        self._reroot(board, player)
+        root = self.root
+        if playouts is None:
+            playouts = self.playouts if time_limit is None else 1 << 62
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        done = 0
+        while done < playouts:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if should_stop is not None and should_stop():
+                break
+            paths, results, leaves, to_move = [], [], [], []
+            for _ in range(min(self.batch, playouts - done)):
+                work = board.copy()
+                path = self._select(work)
+                for node in path:
+                    node.visits += 1  # 虚拟损失：模拟结果回传前先按输处理
+                paths.append(path)
+                leaf = path[-1]
+                results.append(leaf.winner)
+                if leaf.winner is None:  # 已分胜负的叶子不需要模拟
+                    leaves.append(work)
+                    to_move.append(3 - leaf.player)
+            if leaves:
+                winners = iter(self.rollout(np.stack(leaves), np.array(to_move)).tolist())
+            for path, winner in zip(paths, results):
+                if winner is None:
+                    winner = next(winners)
+                for node in path:
+                    if winner == node.player:
+                        node.value += 1.0
+                    elif winner == 0:
+                        node.value += 0.5
+            done += len(paths)
+        self.simulations = done
+
+        if not root.children:
+            return None, done
+        best = max(root.children, key=lambda ch: ch.visits)
+        return best.move, done
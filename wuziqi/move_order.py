@@ -0,0 +1,68 @@
+"""着法排序与候选剪枝：进攻+防守启发分，优先处理必胜和必堵的着法"""
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+def makes_five(board, r, c, player):
+    """在空点 (r, c) 落下 player 的棋子后是否成五"""
+    size = len(board)
+    for dr, dc in DIRECTIONS:
+        count = 1
+        nr, nc = r + dr, c + dc
+        while 0 <= nr < size and 0 <= nc < size and board[nr][nc] == player:
+            count += 1
+            nr += dr
+            nc += dc
+        nr, nc = r - dr, c - dc
+        while 0 <= nr < size and 0 <= nc < size and board[nr][nc] == player:
+            count += 1
+            nr -= dr
+            nc -= dc
+        if count >= 5:
+            return True
+    return False
+
+
+def order_moves(game, moves, player, top_k=None):
+    """对 player 的候选着法排序
+
+    启发分 = evaluate_position(己方) + evaluate_position(对方)，即在该点落子的进攻价值
+    加上抢占对方要点的防守价值。能直接成五时只返回成五的着法；对方有成五点时只返回
+    堵点。game.history 不为 None 时启发分加上历史分，当前层的杀手着法紧跟在分数最高的着法之后。
+    top_k 不为 None 时只保留分数最高的 top_k 个着法。
+    """
+    opponent = 3 - player
+    five_score = game.evaluator.run_scores[4][0]
+    board = game.board
+
+    scored = []
+    blocks = []
+    for r, c in dict.fromkeys(moves):  # 去掉重复的候选点
+        attack = game.evaluate_position(r, c, player)
+        # 评估分达到成五分才可能成五，避免每个点都做完整检查
+        if attack >= five_score and makes_five(board, r, c, player):
+            return [(r, c)]
+        defence = game.evaluate_position(r, c, opponent)
+        if defence >= five_score and makes_five(board, r, c, opponent):
+            blocks.append((r, c))
+        scored.append((attack + defence, (r, c)))
+
+    if blocks:
+        return blocks
+
+    history = game.history
+    if history is not None:
+        table = history.scores(player)
+        size = history.size
+        scored = [(score + table[r * size + c], (r, c)) for score, (r, c) in scored]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    if history is not None:
+        # 杀手着法排在启发分最高的着法之后：静态启发分对五子棋已经很准，放在最前反而更差
+        killers = [k for k in history.killer_moves(game.ply) if k is not None]
+        rest = scored[1:]
+        if killers and any(item[1] in killers for item in rest):
+            front = [item for k in killers for item in rest if item[1] == k]
+            scored = scored[:1] + front + [item for item in rest if item[1] not in killers]
+    if top_k is not None:
+        scored = scored[:top_k]
+    return [move for _, move in scored]
@@ -0,0 +1,163 @@
+"""开局库：按棋盘8种对称变换归一后的 Zobrist 哈希索引
+
+文件格式：16字节文件头（魔数、棋盘大小、条目数）+ 按键排序的 8 字节哈希数组
++ 同样顺序的着法格子下标数组（1字节，超过 256 格的棋盘为 2 字节；着法记录在归一后的坐标系中）。
+键数组紧接文件头、8 字节对齐，读取时键和着法分别用 np.memmap 映射，
+二分查找直接在映射的键数组上进行，每次查询只读取 O(log N) 个页，启动时不需要加载任何数据。
+
+构建开局库：python opening_book.py --out opening_book.bin --plies 6 --depth 4
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from zobrist import Zobrist
+
+MAGIC = b'GMKBOOK2'
+HEADER = struct.Struct('<8sII')  # 魔数, 棋盘大小, 条目数
+KEY = np.dtype('<u8')
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+# 8种对称变换：(r, c) -> 新坐标，n 为 size - 1
+TRANSFORMS = [
+    lambda r, c, n: (r, c),
+    lambda r, c, n: (c, n - r),          # 顺时针旋转90度
+    lambda r, c, n: (n - r, n - c),      # 旋转180度
+    lambda r, c, n: (n - c, r),          # 旋转270度
+    lambda r, c, n: (r, n - c),          # 左右翻转
+    lambda r, c, n: (n - r, c),          # 上下翻转
+    lambda r, c, n: (c, r),              # 主对角线翻转
+    lambda r, c, n: (n - c, n - r),      # 副对角线翻转
+]
+INVERSE = [0, 3, 2, 1, 4, 5, 6, 7]
+
+
+def canonical_key(board, zobrist):
+    """返回 (归一哈希, 所用变换编号)：8种对称局面中哈希最小的一个"""
+    size = zobrist.size
+    n = size - 1
+    stones = [(r, c, int(board[r][c])) for r, c in zip(*np.nonzero(board))]
+    best = None
+    for t, transform in enumerate(TRANSFORMS):
+        h = 0
+        for r, c, p in stones:
+            tr, tc = transform(r, c, n)
+            h ^= zobrist.keys[p][tr * size + tc]
+        if best is None or h < best[0]:
+            best = (h, t)
+    return best
+
+
+def move_dtype(size):
+    return np.dtype('u1' if size * size <= 256 else '<u2')
+
+
+class OpeningBook:
+    def __init__(self, path=BOOK_FILE):
+        with open(path, 'rb') as f:
+            magic, size, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"不是开局库文件: {path}")
+        self.size = size
+        self.zobrist = Zobrist(size)
+        if count:
+            self.keys = np.memmap(path, dtype=KEY, mode='r', offset=HEADER.size, shape=(count,))
+            self.moves = np.memmap(path, dtype=move_dtype(size), mode='r',
+                                   offset=HEADER.size + count * KEY.itemsize, shape=(count,))
+        else:
+            self.keys = np.zeros(0, dtype=KEY)
+            self.moves = np.zeros(0, dtype=move_dtype(size))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, board):
+        """查询当前局面的开局库着法，没有收录时返回 None"""
+        if not len(self.keys):
+            return None
+        key, t = canonical_key(board, self.zobrist)
+        keys = self.keys
+        i = int(np.searchsorted(keys, np.uint64(key)))
+        if i >= len(keys) or int(keys[i]) != key:
+            return None
+        r, c = divmod(int(self.moves[i]), self.size)
+        # 着法从归一坐标系变换回当前局面
+        r, c = TRANSFORMS[INVERSE[t]](r, c, self.size - 1)
+        if board[r][c] != 0:
+            return None
+        return r, c
+
+
+def write_book(path, entries, size=15):
+    """entries: {归一哈希: 归一坐标系中的格子下标}，按键排序后写入文件"""
+    keys = sorted(entries)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, size, len(keys)))
+        np.array(keys, dtype=KEY).tofile(f)
+        np.array([entries[key] for key in keys], dtype=move_dtype(size)).tofile(f)
+
+
+def build_book(path, plies=6, depth=4, width=3):
+    """离线构建开局库：枚举黑棋的 width 个最佳应手，对每个轮到白棋（AI）的局面做深度搜索"""
+    from wenben import TerminalGomoku
+
+    game = TerminalGomoku()
+    game.threat_search = False
+    entries = {}
+    n = game.zobrist.size - 1
+    start = time.time()
+
+    def visit(ply):
+        if ply >= plies or game.game_over:
+            return
+        if ply % 2 == 0:
+            # 黑棋：展开排序后的前 width 个着法
+            moves = game.generate_moves(1)[:width]
+            for r, c in moves:
+                game.place_stone(r, c, 1)
+                game.game_over = game.check_win(r, c)
+                visit(ply + 1)
+                game.remove_stone(r, c)
+                game.game_over = False
+            return
+
+        key, t = canonical_key(game.board, game.zobrist)
+        if key in entries:
+            return
+        if game.tt is not None:
+            game.tt.new_search()
+        _, move = game.minimax(depth, float('-inf'), float('inf'), True)
+        if move is None:
+            return
+        r, c = move
+        cr, cc = TRANSFORMS[t](r, c, n)
+        entries[key] = cr * (n + 1) + cc
+        print(f"已收录 {len(entries)} 个局面 ({time.time() - start:.1f}秒)")
+
+        game.place_stone(r, c, 2)
+        game.game_over = game.check_win(r, c)
+        visit(ply + 1)
+        game.remove_stone(r, c)
+        game.game_over = False
+
+    visit(0)
+    write_book(path, entries, n + 1)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建五子棋开局库")
+    parser.add_argument('--out', default=BOOK_FILE)
+    parser.add_argument('--plies', type=int, default=6, help="收录的开局步数")
+    parser.add_argument('--depth', type=int, default=4, help="每个局面的搜索深度")
+    parser.add_argument('--width', type=int, default=3, help="每步展开的黑棋着法数")
+    args = parser.parse_args()
+    count = build_book(args.out, args.plies, args.depth, args.width)
+    print(f"开局库已写入 {args.out}，共 {count} 个局面")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""带哨兵边框的一维棋盘
+
+(size+2) x (size+2) 的 bytearray，四周一圈格子恒为哨兵值 3（既不是空点也不是任何一方的棋子），
+第 r 行第 c 列对应下标 (r + 1) * stride + c + 1，stride = size + 2。
+四个方向的偏移：横 1，竖 stride，左上-右下 stride+1，右上-左下 stride-1。
+沿方向走到哨兵格时与遇到对方棋子一样停下，所以循环里不需要判断越界。
+"""
+
+SENTINEL = 3
+
+
+class PaddedBoard:
+    def __init__(self, size=15):
+        self.size = size
+        self.stride = size + 2
+        s = self.stride
+        self.offsets = (1, s, s + 1, s - 1)
+        self.around = (-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1)
+        # 棋盘内格子的下标（行优先）及其坐标
+        self.inner = [(r + 1) * s + c + 1 for r in range(size) for c in range(size)]
+        self.points = {p: divmod(i, size) for i, p in enumerate(self.inner)}
+        self.reset()
+
+    def reset(self):
+        self.cells = bytearray([SENTINEL]) * (self.stride * self.stride)
+        for p in self.inner:
+            self.cells[p] = 0
+        self.stones = 0
+
+    def index(self, row, col):
+        return (row + 1) * self.stride + col + 1
+
+    def place(self, row, col, player):
+        self.cells[(row + 1) * self.stride + col + 1] = player
+        self.stones += 1
+
+    def remove(self, row, col, player):
+        self.cells[(row + 1) * self.stride + col + 1] = 0
+        self.stones -= 1
+
+    def check_win(self, row, col):
+        """检查经过 (row, col) 的棋子是否构成五连"""
+        cells = self.cells
+        p = (row + 1) * self.stride + col + 1
+        player = cells[p]
+        for d in self.offsets:
+            count = 1
+            q = p + d
+            while cells[q] == player:
+                count += 1
+                q += d
+            q = p - d
+            while cells[q] == player:
+                count += 1
+                q -= d
+            if count >= 5:
+                return True
+        return False
+
+    def evaluate_position(self, row, col, player, run_scores):
+        """与引擎逐格数子的 evaluate_position 相同：run_scores[连续数][空端数] 按四个方向累加"""
+        cells = self.cells
+        p = (row + 1) * self.stride + col + 1
+        score = 0
+        for d in self.offsets:
+            count = 0
+            empty_ends = 0
+            q = p + d
+            while cells[q] == player:
+                count += 1
+                q += d
+            if cells[q] == 0:
+                empty_ends += 1
+            q = p - d
+            while cells[q] == player:
+                count += 1
+                q -= d
+            if cells[q] == 0:
+                empty_ends += 1
+            score += run_scores[min(count, 4)][empty_ends]
+        return score
+
+    def neighbour_moves(self):
+        """与已有棋子相邻的空点，按行优先顺序（与整盘扫描的顺序一致）"""
+        cells = self.cells
+        around = self.around
+        points = self.points
+        return [points[p] for p in self.inner
+                if cells[p] == 0 and any(0 < cells[p + o] < SENTINEL for o in around)]
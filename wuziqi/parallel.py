@@ -0,0 +1,157 @@
+"""根节点并行搜索：把根节点着法分给多个进程搜索
+
+先在本进程搜索排序后的第一个着法得到 α，其余着法以 (α, +∞) 窗口并行搜索，
+比 α 好的着法得到精确值，其余只是上界，最终按"分数最高、同分取排序靠前"选择，
+结果与串行搜索一致且不依赖进程完成的先后顺序。搜索算法（α-β 或 PVS）与主进程的
+search_mode 一致，最佳着法的主要变例记在 game.pv。
+每个工作进程只创建一次引擎，局面以 size*size 字节的快照传输、只同步变化的格子，
+因此置换表和历史表在多步之间保留，每次根节点搜索开始一个新的置换表代并老化历史表。
+搜索设置随每个任务发送，主进程改了 search_mode 等设置后工作进程立即跟上。
+game.cancel_event 被设置时通过进程间共享的事件中止工作进程中的搜索。
+"""
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from search import INF, generate_moves, minimax, principal_variation, pvs, search_root
+
+# 工作进程内的引擎、它当前加载的局面快照和搜索代
+_worker_game = None
+_worker_snapshot = None
+_worker_generation = None
+
+# 需要同步到工作进程的搜索设置
+SETTINGS = ('eval_mode', 'move_ordering', 'top_k', 'quiescence_depth', 'search_mode',
+            'use_pattern_table')
+
+
+def board_snapshot(board):
+    return np.asarray(board, dtype=np.int8).tobytes()
+
+
+def _init_worker(engine_cls, kwargs, stop_event):
+    global _worker_game
+    _worker_game = engine_cls(**kwargs)
+    _worker_game.book = None
+    _worker_game.cancel_event = stop_event
+
+
+def _load_snapshot(snapshot):
+    """只同步与快照不同的格子，不重置引擎，置换表和历史表得以保留"""
+    global _worker_snapshot
+    if snapshot == _worker_snapshot:
+        return
+    game = _worker_game
+    cells = np.frombuffer(snapshot, dtype=np.int8).reshape(game.board.shape)
+    for r, c in np.argwhere(game.board != cells).tolist():
+        if game.board[r][c]:
+            game.remove_stone(r, c)
+        if cells[r][c]:
+            game.place_stone(r, c, int(cells[r][c]))
+    game.game_over = False
+    _worker_snapshot = snapshot
+
+
+def search_move(game, move, depth, alpha):
+    """白棋在根节点走 move 后按 game.search_mode 搜索剩余深度，窗口为 (alpha, +∞)
+
+    返回 (白棋视角的分数, 以 move 开头的主要变例)。
+    """
+    r, c = move
+    game.place_stone(r, c, 2)
+    prev_game_over = game.game_over
+    game.game_over = game.check_win(r, c)
+    game.ply = 1
+    if game.search_mode == 'pvs':
+        score, pv = pvs(game, depth - 1, -INF, -alpha, 1)
+        score, pv = -score, [move] + pv
+    else:
+        score, _ = minimax(game, depth - 1, alpha, INF, False)
+        pv = None
+    game.ply = 0
+    game.remove_stone(r, c)
+    game.game_over = prev_game_over
+    if pv is None:
+        pv = principal_variation(game, move)
+    return score, pv
+
+
+def _search_root_move(snapshot, generation, settings, move, depth, alpha):
+    """在工作进程中搜索一个根节点着法，返回 (分数, 主要变例, 节点数)"""
+    global _worker_generation
+    _load_snapshot(snapshot)
+    game = _worker_game
+    for name, value in settings.items():
+        setattr(game, name, value)
+    if generation != _worker_generation:
+        # 新的一次根节点搜索：与串行的 choose_move 一样开始新的置换表代并老化历史表
+        if game.tt is not None:
+            game.tt.new_search()
+        if game.history is not None:
+            game.history.age()
+        _worker_generation = generation
+    game.nodes = 0
+    game.stop_search = False
+    score, pv = search_move(game, move, depth, alpha)
+    return score, pv, game.nodes
+
+
+class ParallelSearcher:
+    def __init__(self, game, workers=4):
+        self.workers = workers
+        kwargs = {
+            'board_mode': game.board_mode,
+            'candidate_radius': game.candidates.radius if game.candidates else None,
+            'size': game.size,
+        }
+        self.stop_event = multiprocessing.Event()
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(type(game), kwargs, self.stop_event))
+        self.generation = 0
+
+    def search(self, game, depth):
+        """并行搜索 AI（白棋）的根节点，返回 (分数, 着法)，主要变例记在 game.pv"""
+        moves = generate_moves(game, 2)
+        if not moves:
+            game.pv = []
+            return 0, None
+        if depth <= 1 or len(moves) == 1:
+            return search_root(game, depth)
+
+        # 第一个着法串行搜索，为其余着法提供 α
+        best_move = moves[0]
+        best_score, best_pv = search_move(game, best_move, depth, -INF)
+        if game.stop_search:
+            game.pv = best_pv
+            return best_score, best_move
+
+        self.generation += 1
+        self.stop_event.clear()
+        snapshot = board_snapshot(game.board)
+        settings = {name: getattr(game, name) for name in SETTINGS}
+        futures = [self.pool.submit(_search_root_move, snapshot, self.generation, settings,
+                                    move, depth, best_score)
+                   for move in moves[1:]]
+        # 等待期间检查取消：取消时中止工作进程中的搜索，使用第一个着法的结果
+        pending = set(futures)
+        while pending:
+            if game.cancel_event is not None and game.cancel_event.is_set():
+                self.stop_event.set()
+                for future in pending:
+                    future.cancel()
+                game.stop_search = True
+                game.pv = best_pv
+                return best_score, best_move
+            _, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+        # 按着法顺序收集，严格大于才替换，保证结果确定
+        for move, future in zip(moves[1:], futures):
+            score, pv, nodes = future.result()
+            game.nodes += nodes
+            if score > best_score:
+                best_score, best_move, best_pv = score, move, pv
+        game.pv = best_pv
+        return best_score, best_move
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
@@ -0,0 +1,190 @@
+"""预计算的棋型查表
+
+以某点为中心、每个方向取9格窗口，其余8格按"空/己方/阻挡(对方或棋盘外)"三进制编码，
+共 3^8 = 6561 种窗口，预先分类为 五连/活四/冲四/活三/眠三/活二/眠二/单子。
+与逐格数连续棋子的写法不同，分类时考虑窗口内所有包含中心的五格/六格片段，
+因此能识别 XX_X、X_XXX 这类跳子棋型。
+
+分类表首次使用时生成并缓存到磁盘。搜索中 LinePatterns 为每条线维护一个
+每格2位的编码（含墙），评估一个点时每个方向只需一次移位取窗口和一次查表。
+"""
+import os
+
+import numpy as np
+
+from incremental_eval import build_lines
+
+CLASS_NAMES = ['none', 'single', 'half_two', 'open_two', 'half_three', 'open_three',
+               'half_four', 'open_four', 'five']
+NONE, SINGLE, HALF_TWO, OPEN_TWO, HALF_THREE, OPEN_THREE, HALF_FOUR, OPEN_FOUR, FIVE = range(9)
+
+RADIUS = 4
+WINDOW = 2 * RADIUS + 1
+EMPTY, OWN, BLOCKED = 0, 1, 2
+WALL = 3  # 线编码中棋盘外的格子
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'pattern_classes_v1.npy')
+
+
+def _five_windows(w):
+    """所有包含中心的五格片段"""
+    return [w[s:s + 5] for s in range(RADIUS - 4, RADIUS + 1)]
+
+
+def _has_open_four(w):
+    # 包含中心的六格片段两端为空、中间四格全是己方
+    for s in range(RADIUS - 4, RADIUS):
+        if s >= 0 and s + 5 < WINDOW and w[s] == EMPTY and w[s + 5] == EMPTY \
+                and all(v == OWN for v in w[s + 1:s + 5]):
+            return True
+    return False
+
+
+def _completes(w, test):
+    """是否存在某个空位，填上己方棋子后满足 test"""
+    for i, v in enumerate(w):
+        if v == EMPTY:
+            w[i] = OWN
+            ok = test(w)
+            w[i] = EMPTY
+            if ok:
+                return True
+    return False
+
+
+def _count_windows(w, own):
+    """是否有包含中心、无阻挡且恰好 own 个己方棋子的五格片段"""
+    return any(BLOCKED not in seg and seg.count(OWN) == own for seg in _five_windows(w))
+
+
+def classify(w):
+    """对中心为己方棋子的9格窗口分类"""
+    if any(seg.count(OWN) == 5 for seg in _five_windows(w)):
+        return FIVE
+    if _has_open_four(w):
+        return OPEN_FOUR
+    if _count_windows(w, 4):
+        return HALF_FOUR
+    if _completes(w, _has_open_four):
+        return OPEN_THREE
+    if _count_windows(w, 3):
+        return HALF_THREE
+    if _completes(w, lambda x: _has_open_four(x) or _completes(x, _has_open_four)):
+        return OPEN_TWO
+    if _count_windows(w, 2):
+        return HALF_TWO
+    if _count_windows(w, 1):
+        return SINGLE
+    return NONE
+
+
+def build_ternary_table():
+    """3^8 个三进制窗口编码 -> 棋型分类"""
+    table = np.zeros(3 ** (WINDOW - 1), dtype=np.uint8)
+    for code in range(len(table)):
+        cells = []
+        x = code
+        for _ in range(WINDOW - 1):
+            cells.append(x % 3)
+            x //= 3
+        w = cells[:RADIUS] + [OWN] + cells[RADIUS:]
+        table[code] = classify(w)
+    return table
+
+
+def build_line_tables(ternary):
+    """把每格2位的线编码窗口（含墙）直接映射为黑、白双方的棋型分类"""
+    codes = np.arange(4 ** WINDOW, dtype=np.int64)
+    cells = [(codes >> (2 * k)) & 3 for k in range(WINDOW) if k != RADIUS]
+    tables = np.zeros((3, 4 ** WINDOW), dtype=np.uint8)
+    for player in (1, 2):
+        index = np.zeros_like(codes)
+        for k, cell in enumerate(cells):
+            rel = np.where(cell == 0, EMPTY, np.where(cell == player, OWN, BLOCKED))
+            index += rel * 3 ** k
+        tables[player] = ternary[index]
+    return tables
+
+
+_classes = None
+_score_tables = {}
+
+
+def load_classes(path=CACHE_FILE):
+    """读取（或首次生成并缓存）双方的线窗口分类表"""
+    global _classes
+    if _classes is None:
+        try:
+            _classes = np.load(path)
+            if _classes.shape != (3, 4 ** WINDOW) or _classes.dtype != np.uint8:
+                raise ValueError(f"分类表形状不符: {_classes.shape} {_classes.dtype}")
+        except (OSError, ValueError):
+            _classes = build_line_tables(build_ternary_table())
+            _save_classes(path, _classes)
+    return _classes
+
+
+def _save_classes(path, classes):
+    """先写临时文件再原子替换，多个进程同时生成时也不会读到写了一半的文件"""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            np.save(f, classes)
+        os.replace(tmp, path)
+    except OSError:
+        # 目录不可写时只在内存中使用
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def score_tables(scores):
+    """scores[分类] -> 分值；返回按玩家索引的分值查表（同一组分值在进程内共享）"""
+    key = tuple(scores)
+    if key not in _score_tables:
+        classes = load_classes()
+        values = np.asarray(scores, dtype=np.int64)
+        _score_tables[key] = [None, values[classes[1]].tolist(), values[classes[2]].tolist()]
+    return _score_tables[key]
+
+
+class LinePatterns:
+    """维护每条线的2位编码，O(1) 查询某点四个方向的棋型分"""
+
+    def __init__(self, size, scores):
+        self.size = size
+        self.tables = score_tables(scores)
+        self.lines, self.cell_lines = build_lines(size)
+        self.mask = (1 << (2 * WINDOW)) - 1
+        self.reset()
+
+    def reset(self):
+        # 每条线两端各补 RADIUS 个墙；格子 i 位于第 2*(i+RADIUS) 位
+        self.codes = []
+        for cells in self.lines:
+            code = 0
+            for k in list(range(RADIUS)) + list(range(len(cells) + RADIUS, len(cells) + 2 * RADIUS)):
+                code |= WALL << (2 * k)
+            self.codes.append(code)
+
+    def place(self, row, col, player):
+        codes = self.codes
+        for line_id, i in self.cell_lines[row][col]:
+            codes[line_id] |= player << (2 * (i + RADIUS))
+
+    def remove(self, row, col):
+        codes = self.codes
+        for line_id, i in self.cell_lines[row][col]:
+            codes[line_id] &= ~(3 << (2 * (i + RADIUS)))
+
+    def evaluate_position(self, row, col, player):
+        """假设 (row, col) 为 player 的棋子，四个方向棋型分之和"""
+        table = self.tables[player]
+        codes = self.codes
+        mask = self.mask
+        score = 0
+        for line_id, i in self.cell_lines[row][col]:
+            score += table[(codes[line_id] >> (2 * i)) & mask]
+        return score
@@ -0,0 +1,170 @@
+"""紧凑的二进制对局记录：只追加写入，内存映射读取
+
+数据文件：16字节文件头（魔数、棋盘大小、每步字节数）+ 依次排列的对局，
+每盘为 胜方(1字节，0为和棋或未终局) + 步数(2字节) + 每步一个格子下标
+（row * size + col；15 路棋盘每步 1 字节，超过 256 格时每步 2 字节）。黑先、黑白交替。
+索引文件 <数据文件>.idx：每盘一个 8 字节的起始偏移，同样只追加。
+
+读取时两个文件都用 np.memmap 映射，按下标随机访问任意一盘时返回的着法是映射内存的视图，
+不复制数据，也不为每盘创建 Python 对象；索引文件缺失时扫描数据文件重建，
+索引末尾指向不完整对局的项（写入中途被读取）会被忽略。
+"""
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'GMKREC01'
+HEADER = struct.Struct('<8sII')  # 魔数, 棋盘大小, 每步字节数
+GAME_HEADER = struct.Struct('<BH')  # 胜方, 步数
+RECORD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games.gmr')
+
+
+def record_path(size=15):
+    """各棋盘大小的默认记录文件（文件头中的棋盘大小固定，不同大小不能混在一个文件里）"""
+    return RECORD_FILE if size == 15 else RECORD_FILE[:-len('.gmr')] + f'_{size}.gmr'
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def move_bytes(size):
+    return 1 if size * size <= 256 else 2
+
+
+class GameRecordWriter:
+    """向记录文件追加对局；文件不存在时创建"""
+
+    def __init__(self, path=RECORD_FILE, size=15):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with open(path, 'rb') as f:
+                magic, file_size, width = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"不是对局记录文件: {path}")
+            if file_size != size:
+                raise ValueError(f"记录文件的棋盘大小为 {file_size}，不是 {size}")
+        else:
+            width = move_bytes(size)
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, size, width))
+        self.size = size
+        self.dtype = np.dtype('u1' if width == 1 else '<u2')
+        self.data = open(path, 'ab')
+        self.index = open(index_path(path), 'ab')
+        self.offset = self.data.seek(0, os.SEEK_END)
+
+    def write_cells(self, cells, winner=0):
+        """写入一盘：cells 为格子下标序列，或已按本文件每步字节数编码好的字节串"""
+        if isinstance(cells, bytes):
+            count = len(cells) // self.dtype.itemsize
+        else:
+            count = len(cells)
+            cells = np.asarray(cells, dtype=self.dtype).tobytes()
+        self.data.write(GAME_HEADER.pack(winner, count))
+        self.data.write(cells)
+        # 数据先落到文件里再写索引，索引中的偏移总是指向完整的对局
+        self.data.flush()
+        self.index.write(struct.pack('<Q', self.offset))
+        self.offset += GAME_HEADER.size + len(cells)
+
+    def write(self, moves, winner=0):
+        """写入一盘：moves 为 (row, col) 序列"""
+        self.write_cells([r * self.size + c for r, c in moves], winner)
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecords:
+    """内存映射的只读记录文件，支持按下标随机访问和按局面迭代"""
+
+    def __init__(self, path=RECORD_FILE):
+        with open(path, 'rb') as f:
+            magic, size, width = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"不是对局记录文件: {path}")
+        self.size = size
+        self.dtype = np.dtype('u1' if width == 1 else '<u2')
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        idx = index_path(path)
+        if os.path.exists(idx) and os.path.getsize(idx) >= 8:
+            offsets = np.memmap(idx, dtype='<u8', mode='r', shape=(os.path.getsize(idx) // 8,))
+            # 只追加写入，不完整的对局只可能在末尾（正在写入或写入被中断）
+            n = len(offsets)
+            while n and not self.complete(int(offsets[n - 1])):
+                n -= 1
+            self.offsets = offsets[:n]
+        else:
+            self.offsets = self.build_index()
+
+    def build_index(self):
+        """扫描数据文件得到每盘的偏移"""
+        data = self.data
+        offsets = []
+        pos = HEADER.size
+        while self.complete(pos):
+            offsets.append(pos)
+            length = int(data[pos + 1]) | int(data[pos + 2]) << 8
+            pos += GAME_HEADER.size + length * self.dtype.itemsize
+        return np.array(offsets, dtype='<u8')
+
+    def complete(self, pos):
+        """从偏移 pos 开始的对局是否完整地在数据文件中"""
+        data = self.data
+        if pos < HEADER.size or pos + GAME_HEADER.size > len(data):
+            return False
+        length = int(data[pos + 1]) | int(data[pos + 2]) << 8
+        return pos + GAME_HEADER.size + length * self.dtype.itemsize <= len(data)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def winner(self, i):
+        return int(self.data[self.offsets[i]])
+
+    def moves(self, i):
+        """第 i 盘的格子下标数组（映射内存的视图）"""
+        pos = int(self.offsets[i])
+        length = int(self.data[pos + 1]) | int(self.data[pos + 2]) << 8
+        start = pos + GAME_HEADER.size
+        return self.data[start:start + length * self.dtype.itemsize].view(self.dtype)
+
+    def game(self, i):
+        """返回 (胜方, [(row, col), ...])"""
+        return self.winner(i), [divmod(int(cell), self.size) for cell in self.moves(i)]
+
+    def boards(self, i):
+        """第 i 盘每一步之后的局面，形状 (步数, size, size) 的 int8 数组"""
+        cells = self.moves(i).astype(np.intp)
+        n = len(cells)
+        colors = np.where(np.arange(n) % 2 == 0, 1, 2).astype(np.int8)
+        played = np.tri(n, dtype=bool)  # played[k, j]：第 k 步之后第 j 步的棋子已落下
+        boards = np.zeros((n, self.size * self.size), dtype=np.int8)
+        boards[:, cells] = played * colors
+        return boards.reshape(n, self.size, self.size)
+
+    def positions(self, start=0, stop=None):
+        """依次产生 (对局下标, 已走步数, 棋盘)
+
+        棋盘是同一个数组在原地更新，需要保留时请自行复制。
+        """
+        board = np.zeros((self.size, self.size), dtype=np.int8)
+        flat = board.reshape(-1)
+        for i in range(start, len(self) if stop is None else stop):
+            flat[:] = 0
+            for ply, cell in enumerate(self.moves(i).tolist()):
+                flat[cell] = 1 if ply % 2 == 0 else 2
+                yield i, ply + 1, board
@@ -0,0 +1,504 @@
+"""wuziqi.py / wenben.py 共用的搜索驱动
+
+两个前端的引擎只维护棋盘、哈希、评估等状态，选着、着法生成和极小极大搜索都在这里，
+以引擎对象为第一个参数；引擎上的同名方法只是转发。
+"""
+import time
+
+import numpy as np
+
+from move_order import order_moves
+from stats import SearchStats
+from zobrist import EXACT, LOWER, UPPER
+
+INF = float('inf')
+
+
+def limits_exceeded(game):
+    """检查本次搜索是否超出时间或节点预算，或已被其他线程取消"""
+    if game.cancel_event is not None and game.cancel_event.is_set():
+        return True
+    if game.search_node_limit is not None and game.nodes >= game.search_node_limit:
+        return True
+    if game.search_deadline is not None and time.perf_counter() >= game.search_deadline:
+        return True
+    return False
+
+
+def choose_move(game, time_limit=None, node_limit=None, speculative=False):
+    """为AI（白棋）选择着法但不落子，返回 (着法, 说明)
+
+    依次查询开局库、威胁空间搜索；都没有结果时默认固定深度搜索，
+    给定时间或节点预算时迭代加深。speculative 为 True 时是后台思考的试探性搜索：
+    不老化历史表，也不收集和上报统计，这两件事每步只应在实际走棋时做一次。
+    """
+    start_time = time.time()
+    game.nodes = 0
+    game.stop_search = False
+    game.pv = []
+    game.stats = SearchStats() if game.collect_stats and not speculative else None
+    if game.tt is not None:
+        game.tt.new_search()
+        tt_probes, tt_hits = game.tt.probes, game.tt.hits
+    if game.history is not None and not speculative:
+        game.history.age()
+    game.ply = 0
+
+    time_limit = game.time_limit if time_limit is None else time_limit
+    node_limit = game.node_limit if node_limit is None else node_limit
+    move = None
+    if game.book is not None:
+        move = game.book.lookup(game.board)
+        info = "开局库"
+    if move is None and game.threat_search:
+        cancel_event = game.cancel_event
+        move, kind = game.threat_solver.find_move(
+            game.board, 2, game.vcf_depth, game.vct_depth,
+            should_stop=lambda: cancel_event is not None and cancel_event.is_set())
+        info = f"威胁搜索 {kind}"
+        if game.stats is not None:
+            game.stats.threat_nodes = game.threat_solver.nodes
+    if move is None and game.search_mode == 'mcts':
+        if time_limit is not None:
+            time_limit = max(0.0, time_limit - (time.time() - start_time))
+        cancel_event = game.cancel_event
+        move, playouts = game.get_mcts().search(
+            game.board, 2, game.mcts_playouts if time_limit is None else None, time_limit,
+            should_stop=lambda: cancel_event is not None and cancel_event.is_set())
+        info = f"MCTS {playouts} 次模拟"
+    elif move is None:
+        if time_limit is None and node_limit is None:
+            if game.workers > 1:
+                if game.parallel is None:
+                    # 多进程搜索只在 workers > 1 时用到；parallel 依赖本模块，这里才导入
+                    from parallel import ParallelSearcher
+                    game.parallel = ParallelSearcher(game, game.workers)
+                _, move = game.parallel.search(game, game.depth)
+            else:
+                _, move = search_root(game, game.depth)
+            depth = game.depth
+            if game.stats is not None:
+                game.stats.depth_done(depth)
+        else:
+            if time_limit is not None:
+                # 威胁搜索已用掉的时间计入本步预算
+                time_limit = max(0.0, time_limit - (time.time() - start_time))
+            _, move, depth = iterative_deepening(game, game.max_depth, time_limit, node_limit)
+        info = f"深度 {depth}"
+
+    stats = game.stats
+    if stats is not None:
+        if game.tt is not None:
+            stats.tt_probes = game.tt.probes - tt_probes
+            stats.tt_hits = game.tt.hits - tt_hits
+        stats.finish(move, info, game.nodes)
+        game.last_stats = stats
+        game.stats = None
+        if game.stats_callback is not None:
+            game.stats_callback(stats)
+        if game.stats_log:
+            stats.write_jsonl(game.stats_log)
+    return move, info
+
+
+def iterative_deepening(game, max_depth, time_limit=None, node_limit=None):
+    """迭代加深搜索，返回 (分数, 着法, 完成的深度)
+
+    每轮把上一轮的最佳着法放在根节点最先搜索；超时或超出节点数时本轮作废，
+    使用最后一轮完整搜索的结果。第1层总是完整搜索，保证一定有着法可走。
+    PVS 模式下从第2层起使用渴望窗口。最后一轮完整搜索的主要变例记在 game.pv。
+    """
+    start = time.perf_counter()
+    game.nodes = 0
+    game.stop_search = False
+    game.search_deadline = None
+    game.search_node_limit = None
+
+    best_score, best_move, completed = 0, None, 0
+    best_pv = []
+    try:
+        for depth in range(1, max_depth + 1):
+            alpha, beta = -INF, INF
+            if game.search_mode == 'pvs' and depth > 1:
+                # 渴望窗口：以上一轮分数为中心的窄窗口，失败的一侧放开后重搜
+                alpha = best_score - game.aspiration_window
+                beta = best_score + game.aspiration_window
+            while True:
+                score, move = search_root(game, depth, alpha, beta, first_move=best_move)
+                if game.stop_search or alpha < score < beta:
+                    break
+                if score <= alpha:
+                    alpha = -INF
+                else:
+                    beta = INF
+            if game.stop_search:
+                break
+            best_score, best_move, completed = score, move, depth
+            best_pv = game.pv
+            if game.stats is not None:
+                game.stats.depth_done(depth)
+            if move is None:
+                break
+
+            if depth == 1:
+                if time_limit is not None:
+                    game.search_deadline = start + time_limit
+                game.search_node_limit = node_limit
+            # 下一层通常比已用时间多花数倍，剩余时间不足一半时不再开始新一轮
+            if time_limit is not None and time.perf_counter() - start > time_limit / 2:
+                break
+    finally:
+        game.search_deadline = None
+        game.search_node_limit = None
+        game.stop_search = False
+        game.pv = best_pv
+
+    return best_score, best_move, completed
+
+
+def principal_variation(game, move, max_len=10):
+    """从根节点最佳着法出发，沿置换表中记录的最佳着法还原主要变例"""
+    pv = []
+    placed = []
+    player = 2
+    try:
+        while move is not None and len(pv) < max_len:
+            r, c = move
+            if game.board[r][c] != 0:
+                break
+            pv.append(move)
+            game.place_stone(r, c, player)
+            placed.append(move)
+            if game.check_win(r, c) or game.tt is None:
+                break
+            player = 3 - player
+            entry = game.tt.peek(game.hash ^ (game.zobrist.side_key if player == 2 else 0))
+            move = entry[3] if entry is not None else None
+    finally:
+        for r, c in reversed(placed):
+            game.remove_stone(r, c)
+    return pv
+
+
+def search_root(game, depth, alpha=-INF, beta=INF, first_move=None):
+    """按 game.search_mode 搜索AI（白棋）的根节点，返回 (分数, 着法)，主要变例记在 game.pv"""
+    if game.search_mode == 'pvs':
+        score, pv = pvs(game, depth, alpha, beta, 2, first_move)
+    else:
+        score, move = minimax(game, depth, alpha, beta, True, first_move=first_move)
+        pv = principal_variation(game, move) if not game.stop_search else []
+    game.pv = pv
+    return score, (pv[0] if pv else None)
+
+
+def get_available_moves(game):
+    """获取所有可行的落子位置（只考虑有棋子周围的点）"""
+    if game.candidates is not None:
+        if game.bits.occupied():
+            return game.candidates.moves()
+        return [(game.center, game.center)]
+
+    if game.bitboard is not None:
+        if game.bitboard.occupied():
+            return list(game.bitboard.iter_points(game.bitboard.neighbors(1)))
+        return [(game.center, game.center)]
+
+    if game.padded is not None:
+        return game.padded.neighbour_moves() if game.padded.stones else [(game.center, game.center)]
+
+    moves = []
+
+    # 如果有棋子，只考虑棋子周围的点
+    if np.any(game.board):
+        for r in range(game.size):
+            for c in range(game.size):
+                # 检查周围是否有棋子（每个点只加入一次）
+                if game.board[r][c] == 0 and any(
+                        0 <= r + dr < game.size and 0 <= c + dc < game.size
+                        and game.board[r + dr][c + dc] != 0
+                        for dr in range(-1, 2) for dc in range(-1, 2)):
+                    moves.append((r, c))
+    else:
+        # 棋盘为空，选择中心点
+        moves.append((game.center, game.center))
+
+    return moves
+
+def generate_moves(game, player):
+    """搜索用的着法生成：按进攻+防守启发分排序，必胜/必堵时只返回这些着法"""
+    if game.stats is not None:
+        game.stats.movegen_calls += 1
+    moves = get_available_moves(game)
+    if game.move_ordering:
+        moves = order_moves(game, moves, player, game.top_k)
+    return moves
+
+def minimax(game, depth, alpha, beta, maximizing_player, first_move=None):
+    """极小极大算法，带α-β剪枝和置换表"""
+    # 节点计数，定期检查时间/节点预算，超出后各层立即返回
+    game.nodes += 1
+    if game.nodes & 63 == 0 and limits_exceeded(game):
+        game.stop_search = True
+    if game.stop_search:
+        return 0, None
+
+    # 游戏结束或达到搜索深度
+    if depth == 0 or game.game_over:
+        if game.stats is not None:
+            game.stats.leaves += 1
+        if depth == 0 and not game.game_over and game.quiescence_depth:
+            if maximizing_player:
+                return threat_extension(game, alpha, beta, 2, game.quiescence_depth), None
+            return -threat_extension(game, -beta, -alpha, 1, game.quiescence_depth), None
+        return game.evaluate(), None  # 电脑白棋(2)得分减玩家黑棋(1)得分
+
+    # 查询置换表：足够深的条目可直接返回或收窄窗口
+    tt_move = None
+    if game.tt is not None:
+        key = game.hash ^ (game.zobrist.side_key if maximizing_player else 0)
+        entry = game.tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, value, tt_move = entry
+            if tt_depth >= depth and tt_move is not None:
+                if flag == EXACT:
+                    return value, tt_move
+                elif flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value, tt_move
+    alpha_orig, beta_orig = alpha, beta
+
+    moves = generate_moves(game, 2 if maximizing_player else 1)
+    if not moves:
+        return 0, None
+
+    # 置换表中的最佳着法和上一轮迭代的最佳着法优先搜索
+    for hint in (first_move, tt_move):
+        if hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+    best_move = None
+
+    if maximizing_player:  # 电脑（最大化）
+        max_eval = float('-inf')
+        for i, move in enumerate(moves):
+            r, c = move
+            game.place_stone(r, c, 2)  # 电脑落白棋
+            prev_game_over = game.game_over
+            game.game_over = game.check_win(r, c)
+
+            game.ply += 1
+            eval_score, _ = minimax(game, depth - 1, alpha, beta, False)
+            game.ply -= 1
+
+            game.remove_stone(r, c)  # 撤销落子
+            game.game_over = prev_game_over
+            if game.stop_search:
+                break
+
+            if eval_score > max_eval:
+                max_eval = eval_score
+                best_move = move
+
+            alpha = max(alpha, eval_score)
+            if beta <= alpha:
+                if game.stats is not None:
+                    game.stats.cutoff(i)
+                if game.history is not None:
+                    game.history.record(game.ply, move, 2, depth)
+                break  # α-β剪枝
+
+        best_score = max_eval
+
+    else:  # 玩家（最小化）
+        min_eval = float('inf')
+        for i, move in enumerate(moves):
+            r, c = move
+            game.place_stone(r, c, 1)  # 玩家落黑棋
+            prev_game_over = game.game_over
+            game.game_over = game.check_win(r, c)
+
+            game.ply += 1
+            eval_score, _ = minimax(game, depth - 1, alpha, beta, True)
+            game.ply -= 1
+
+            game.remove_stone(r, c)  # 撤销落子
+            game.game_over = prev_game_over
+            if game.stop_search:
+                break
+
+            if eval_score < min_eval:
+                min_eval = eval_score
+                best_move = move
+
+            beta = min(beta, eval_score)
+            if beta <= alpha:
+                if game.stats is not None:
+                    game.stats.cutoff(i)
+                if game.history is not None:
+                    game.history.record(game.ply, move, 1, depth)
+                break  # α-β剪枝
+
+        best_score = min_eval
+
+    # 写入置换表
+    if game.tt is not None and not game.stop_search:
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        game.tt.store(key, depth, flag, best_score, best_move)
+
+    return best_score, best_move
+
+
+def pvs(game, depth, alpha, beta, player, first_move=None):
+    """negamax 形式的主要变例搜索，返回 (player 视角的分数, 主要变例)
+
+    第一个着法用完整窗口搜索，其余着法先用零窗口证明不比当前最好着法好，
+    失败（分数落在窗口内）时再用完整窗口重搜。置换表中的分数统一按白棋视角存取，
+    与 minimax 共用同一张表。
+    """
+    game.nodes += 1
+    if game.nodes & 63 == 0 and limits_exceeded(game):
+        game.stop_search = True
+    if game.stop_search:
+        return 0, []
+
+    sign = 1 if player == 2 else -1
+    if depth == 0 or game.game_over:
+        if game.stats is not None:
+            game.stats.leaves += 1
+        if depth == 0 and not game.game_over and game.quiescence_depth:
+            return threat_extension(game, alpha, beta, player, game.quiescence_depth), []
+        return sign * game.evaluate(), []
+
+    # 置换表条目的标志按调用时的原始窗口判断，不受置换表收窄的影响
+    alpha_orig, beta_orig = alpha, beta
+    tt_move = None
+    if game.tt is not None:
+        key = game.hash ^ (game.zobrist.side_key if player == 2 else 0)
+        entry = game.tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, value, tt_move = entry
+            if tt_depth >= depth and tt_move is not None:
+                value *= sign
+                if sign < 0 and flag != EXACT:
+                    flag = UPPER if flag == LOWER else LOWER
+                if flag == EXACT:
+                    return value, [tt_move]
+                elif flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value, [tt_move]
+
+    moves = generate_moves(game, player)
+    if not moves:
+        return 0, []
+
+    for hint in (first_move, tt_move):
+        if hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+    best_score, best_move, best_pv = -INF, None, []
+    for i, move in enumerate(moves):
+        r, c = move
+        game.place_stone(r, c, player)
+        prev_game_over = game.game_over
+        game.game_over = game.check_win(r, c)
+
+        game.ply += 1
+        if i == 0:
+            score, child_pv = pvs(game, depth - 1, -beta, -alpha, 3 - player)
+            score = -score
+        else:
+            score, child_pv = pvs(game, depth - 1, -alpha - 1, -alpha, 3 - player)
+            score = -score
+            if alpha < score < beta:
+                score, child_pv = pvs(game, depth - 1, -beta, -alpha, 3 - player)
+                score = -score
+
+        game.ply -= 1
+        game.remove_stone(r, c)
+        game.game_over = prev_game_over
+        if game.stop_search:
+            break
+
+        if score > best_score:
+            best_score, best_move = score, move
+            best_pv = [move] + child_pv
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            if game.stats is not None:
+                game.stats.cutoff(i)
+            if game.history is not None:
+                game.history.record(game.ply, move, player, depth)
+            break
+
+    if game.tt is not None and not game.stop_search:
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if sign < 0 and flag != EXACT:
+            flag = UPPER if flag == LOWER else LOWER
+        game.tt.store(key, depth, flag, sign * best_score, best_move)
+
+    return best_score, best_pv
+
+
+def threat_extension(game, alpha, beta, player, plies):
+    """视界处的威胁延伸（negamax 形式），返回 player 视角的分数
+
+    静态局面直接评估会在冲四后、堵四前截断，分数随深度奇偶剧烈摆动。这里只继续搜索
+    强制着法：能成五就成五；对方有成五点（冲四或活四）时必须堵，且不能停下；
+    否则可以按静态分停下（stand pat），或继续冲四。最多延伸 plies 步。
+    """
+    bits = game.bits
+    sign = 1 if player == 2 else -1
+    opponent = 3 - player
+
+    wins = bits.five_points(player)
+    if wins:
+        r, c = next(bits.iter_points(wins))
+        game.nodes += 1
+        game.place_stone(r, c, player)
+        score = sign * game.evaluate()
+        game.remove_stone(r, c)
+        return score
+
+    blocks = bits.five_points(opponent)
+    if blocks:
+        # 必须堵四，静态分不可信
+        best = -INF
+        moves = list(bits.iter_points(blocks))
+    else:
+        best = sign * game.evaluate()
+        if plies <= 0 or best >= beta:
+            return best
+        alpha = max(alpha, best)
+        moves = list(bits.iter_points(bits.four_points(player)))
+    if plies <= 0:
+        return sign * game.evaluate()
+
+    for r, c in moves:
+        game.nodes += 1
+        game.place_stone(r, c, player)
+        score = -threat_extension(game, -beta, -alpha, opponent, plies - 1)
+        game.remove_stone(r, c)
+        if score > best:
+            best = score
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    return best
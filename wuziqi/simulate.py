@@ -0,0 +1,147 @@
+"""向量化的大批量自对弈模拟器，用于生成训练和分析数据
+
+N 盘棋保存在一个 (N, size, size) 的 int8 数组里，每一步所有未结束的对局各落一子，
+只检查经过新棋子的四条线判断成五。结束的对局立即写出并原地清空槽位重新开局，
+数组在整个运行期间不重新分配。
+
+用法示例:
+    python simulate.py --games 200000 --batch 4096 --policy tactical --out games.gmr
+
+着法策略:
+    random    在已有棋子的邻域内均匀随机落子
+    tactical  能成五就成五，对方有成五点就堵，否则随机（仍是向量化的）
+开局第一步在中心 5x5 区域内随机选择。
+
+输出为 records.py 的对局记录格式（每步一个格子下标，超过 256 格的棋盘每步 2 字节，附偏移索引），
+可用 records.GameRecords 内存映射读取。
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from batch_board import five_at, mark_neighbours, sample_moves, update_five_points
+from records import GameRecordWriter
+
+OPENING_RADIUS = 2
+
+
+class BatchSimulator:
+    def __init__(self, n_games=4096, size=15, policy='random', radius=1, seed=None):
+        self.n = n_games
+        self.size = size
+        self.policy = policy
+        self.radius = radius
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((n_games, size, size), dtype=np.int8)
+        self.near = np.zeros((n_games, size, size), dtype=bool)
+        self.players = np.ones(n_games, dtype=np.int8)
+        # 与记录文件的编码一致：不超过 256 格时每步 1 字节，否则 2 字节
+        self.moves = np.zeros((n_games, size * size), dtype=np.uint8 if size * size <= 256 else '<u2')
+        self.lengths = np.zeros(n_games, dtype=np.int64)
+        # tactical 策略用的双方成五点，随落子增量维护
+        self.five_points = np.zeros((n_games, 3, size, size), dtype=bool) if policy == 'tactical' else None
+        self.opening = np.zeros((size, size), dtype=bool)
+        center = size // 2
+        self.opening[center - OPENING_RADIUS:center + OPENING_RADIUS + 1,
+                     center - OPENING_RADIUS:center + OPENING_RADIUS + 1] = True
+        self.reset_slots(np.arange(n_games))
+        self.finished = 0
+
+    def reset_slots(self, slots):
+        """原地清空结束的对局，开始新的一盘（第一步的合法点为中心开局区域）"""
+        self.boards[slots] = 0
+        self.near[slots] = self.opening
+        self.players[slots] = 1
+        self.lengths[slots] = 0
+        if self.five_points is not None:
+            self.five_points[slots] = False
+
+    def choose(self, legal):
+        """按策略为每盘选择落子点，返回展开的格子下标和是否有合法着法"""
+        if self.policy == 'tactical':
+            # 先在合法点中随机；对方有成五点的对局只在堵点中选，自己能成五的对局只在成五点中选
+            n = self.n
+            games = np.arange(n)
+            points = self.five_points.reshape(n, 3, -1)
+            flat = legal.reshape(n, -1)
+            keys = self.rng.random(flat.shape, dtype=np.float32)
+            scores = keys * flat
+            for player_points in (points[games, 3 - self.players], points[games, self.players]):
+                urgent = player_points.any(axis=1)
+                if urgent.any():
+                    scores[urgent] = keys[urgent] * player_points[urgent]
+            return scores.argmax(axis=1), flat.any(axis=1)
+        return sample_moves(legal, self.rng)
+
+    def step(self, sink=None):
+        """所有对局各走一步；结束的对局交给 sink(胜方, 着法字节) 并清空槽位，返回本步结束的盘数"""
+        legal = self.near & (self.boards == 0)
+        cells, ok = self.choose(legal)
+        games = np.arange(self.n)
+        full = ~ok
+        games, cells = games[ok], cells[ok]
+        r, c = np.divmod(cells, self.size)
+        self.boards[games, r, c] = self.players[games]
+        self.moves[games, self.lengths[games]] = cells
+        # 开局区域只用于第一步，之后只有已有棋子的邻域是合法点
+        self.near[games[self.lengths[games] == 0]] = False
+        self.lengths[games] += 1
+        mark_neighbours(self.near, games, r, c, self.radius)
+        if self.five_points is not None:
+            update_five_points(self.five_points, self.boards, games, r, c)
+
+        won = np.zeros(self.n, dtype=bool)
+        won[games] = five_at(self.boards, games, r, c)
+        full |= self.lengths == self.size * self.size
+        done = np.flatnonzero(won | full)
+        winners = np.where(won[done], self.players[done], 0)
+        self.players[games] = 3 - self.players[games]
+        if len(done):
+            if sink is not None:
+                for slot, winner in zip(done.tolist(), winners.tolist()):
+                    sink(winner, self.moves[slot, :self.lengths[slot]].tobytes())
+            self.reset_slots(done)
+            self.finished += len(done)
+        return len(done)
+
+    def run(self, total_games, sink=None):
+        """模拟直到结束 total_games 盘（最后一步可能略多），返回实际盘数"""
+        while self.finished < total_games:
+            self.step(sink)
+        return self.finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量化五子棋自对弈模拟")
+    parser.add_argument('--games', type=int, default=100000, help="模拟的总盘数")
+    parser.add_argument('--batch', type=int, default=4096, help="同时进行的对局数")
+    parser.add_argument('--policy', choices=['random', 'tactical'], default='random')
+    parser.add_argument('--size', type=int, default=15, help="棋盘大小")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--out', help="对局记录输出文件")
+    args = parser.parse_args()
+
+    sim = BatchSimulator(args.batch, args.size, args.policy, seed=args.seed)
+    writer = GameRecordWriter(args.out, sim.size) if args.out else None
+    wins = [0, 0, 0]
+
+    def sink(winner, moves):
+        wins[winner] += 1
+        if writer is not None:
+            writer.write_cells(moves, winner)
+
+    start = time.perf_counter()
+    try:
+        games = sim.run(args.games, sink)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"{games} 盘，用时 {elapsed:.1f}秒，{games / elapsed * 60:.0f} 盘/分钟；"
+          f"黑胜 {wins[1]}，白胜 {wins[2]}，和棋 {wins[0]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
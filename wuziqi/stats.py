@@ -0,0 +1,69 @@
+"""搜索统计：在 minimax 中收集节点、叶子、剪枝、评估和着法生成等计数
+
+引擎的 stats 属性为 None 时搜索只多一次属性判断；打开 collect_stats 后
+每次 choose_move 生成一个新的 SearchStats，可通过 last_stats、回调或 JSON-lines 日志获取。
+"""
+import json
+import time
+
+
+class SearchStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.nodes = 0
+        self.leaves = 0
+        self.eval_calls = 0
+        self.movegen_calls = 0
+        self.cutoffs = 0
+        self.cutoff_index = {}   # 发生β剪枝的着法在排序中的下标 -> 次数
+        self.depth_times = {}    # 完成的搜索深度 -> 累计耗时（秒）
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.threat_nodes = 0
+        self.move = None
+        self.info = ''
+
+    def cutoff(self, index):
+        self.cutoffs += 1
+        self.cutoff_index[index] = self.cutoff_index.get(index, 0) + 1
+
+    def depth_done(self, depth):
+        self.depth_times[depth] = round(time.perf_counter() - self.start, 6)
+
+    def finish(self, move, info, nodes):
+        self.elapsed = time.perf_counter() - self.start
+        self.move = move
+        self.info = info
+        self.nodes = nodes
+
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def first_move_cutoff_rate(self):
+        """第一个着法就剪枝的比例，衡量着法排序的质量"""
+        return self.cutoff_index.get(0, 0) / self.cutoffs if self.cutoffs else 0.0
+
+    def to_dict(self):
+        return {
+            'move': list(self.move) if self.move else None,
+            'info': self.info,
+            'elapsed': round(self.elapsed, 6),
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'nodes_per_second': round(self.nodes / self.elapsed) if self.elapsed else 0,
+            'eval_calls': self.eval_calls,
+            'movegen_calls': self.movegen_calls,
+            'cutoffs': self.cutoffs,
+            'cutoff_index': {str(k): v for k, v in sorted(self.cutoff_index.items())},
+            'first_move_cutoff_rate': round(self.first_move_cutoff_rate(), 4),
+            'depth_times': {str(k): v for k, v in self.depth_times.items()},
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': round(self.tt_hit_rate(), 4),
+            'threat_nodes': self.threat_nodes,
+        }
+
+    def write_jsonl(self, path):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False) + '\n')
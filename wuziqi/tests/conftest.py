@@ -0,0 +1,35 @@
+"""测试直接导入 wuziqi/ 下的平铺模块，与在该目录下运行脚本时相同"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wenben import TerminalGomoku  # noqa: E402
+from wuziqi import GomokuGame  # noqa: E402
+
+
+@pytest.fixture(params=[TerminalGomoku, GomokuGame], ids=['wenben', 'wuziqi'])
+def engine_cls(request):
+    """两个前端的引擎类"""
+    return request.param
+
+
+def random_positions(count, size=15, seed=0, max_stones=40):
+    """随机局面（落子序列，黑白交替，不检查胜负），用于比较不同实现的结果"""
+    rng = np.random.default_rng(seed)
+    positions = []
+    for _ in range(count):
+        n = int(rng.integers(1, max_stones))
+        cells = rng.choice(size * size, size=n, replace=False)
+        positions.append([divmod(int(cell), size) for cell in cells])
+    return positions
+
+
+def play(game, moves):
+    """按顺序落子，黑先"""
+    for i, (r, c) in enumerate(moves):
+        game.place_stone(r, c, 1 if i % 2 == 0 else 2)
+    return game
@@ -0,0 +1,41 @@
+from conftest import play, random_positions
+from search import search_root
+
+
+def test_bitboard_matches_array_board(engine_cls):
+    array = engine_cls(board_mode='array', candidate_radius=0)
+    bits = engine_cls(board_mode='bitboard', candidate_radius=0)
+    for moves in random_positions(40, seed=3, max_stones=80):
+        play(array, moves)
+        play(bits, moves)
+        for r, c in moves:
+            assert bits.check_win(r, c) == array.check_win(r, c)
+        assert bits.get_available_moves() == array.get_available_moves()
+        array.reset()
+        bits.reset()
+
+
+def test_five_points_match_brute_force(engine_cls):
+    game = engine_cls(board_mode='bitboard', candidate_radius=0)
+    for moves in random_positions(30, seed=4, max_stones=80):
+        play(game, moves)
+        for player in (1, 2):
+            expected = set()
+            for r, c in zip(*(game.board == 0).nonzero()):
+                r, c = int(r), int(c)
+                game.place_stone(r, c, player)
+                if game.check_win(r, c):
+                    expected.add((r, c))
+                game.remove_stone(r, c)
+            assert set(game.bits.iter_points(game.bits.five_points(player))) == expected
+        game.reset()
+
+
+def test_bitboard_search_matches_array_search(engine_cls):
+    for moves in random_positions(6, seed=5, max_stones=10):
+        results = []
+        for mode in ('array', 'bitboard'):
+            game = play(engine_cls(board_mode=mode, candidate_radius=0), moves)
+            score, move = search_root(game, 2)
+            results.append((score, move, game.nodes))
+        assert results[0] == results[1]
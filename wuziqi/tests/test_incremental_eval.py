@@ -0,0 +1,27 @@
+from conftest import play, random_positions
+
+
+def full_score(game):
+    return game.evaluate_board(2) - game.evaluate_board(1)
+
+
+def test_incremental_score_matches_full_rescan(engine_cls):
+    game = engine_cls()
+    for moves in random_positions(50, seed=1):
+        play(game, moves)
+        for player in (1, 2):
+            assert game.evaluator.score(player) == game.evaluate_board(player)
+        game.eval_mode = 'incremental'
+        assert game.evaluate() == full_score(game)
+        game.reset()
+
+
+def test_incremental_score_survives_unmake(engine_cls):
+    game = engine_cls()
+    for moves in random_positions(20, seed=2):
+        play(game, moves)
+        for r, c in reversed(moves[len(moves) // 2:]):
+            game.remove_stone(r, c)
+        assert game.evaluator.score(1) == game.evaluate_board(1)
+        assert game.evaluator.score(2) == game.evaluate_board(2)
+        game.reset()
@@ -0,0 +1,28 @@
+from conftest import play, random_positions
+from search import search_root
+
+
+def test_padded_board_matches_array_board(engine_cls):
+    array = engine_cls(board_mode='array', candidate_radius=0)
+    padded = engine_cls(board_mode='padded', candidate_radius=0)
+    for moves in random_positions(40, seed=8, max_stones=80):
+        play(array, moves)
+        play(padded, moves)
+        for r, c in moves:
+            assert padded.check_win(r, c) == array.check_win(r, c)
+        for player in (1, 2):
+            assert padded.evaluate_board(player) == array.evaluate_board(player)
+        assert padded.get_available_moves() == array.get_available_moves()
+        array.reset()
+        padded.reset()
+
+
+def test_padded_search_matches_array_search(engine_cls):
+    for moves in random_positions(4, seed=9, max_stones=10):
+        results = []
+        for mode in ('array', 'padded'):
+            game = play(engine_cls(board_mode=mode, candidate_radius=0), moves)
+            game.eval_mode = 'full'
+            score, move = search_root(game, 2)
+            results.append((score, move, game.nodes, game.pv))
+        assert results[0] == results[1]
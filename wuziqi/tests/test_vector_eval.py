@@ -0,0 +1,28 @@
+import numpy as np
+
+from conftest import play, random_positions
+
+
+def test_vectorized_score_matches_full_rescan(engine_cls):
+    game = engine_cls()
+    for moves in random_positions(50, seed=6, max_stones=80):
+        play(game, moves)
+        assert game.get_vector_evaluator().evaluate(game.board) == (
+            game.evaluate_board(1), game.evaluate_board(2))
+        game.eval_mode = 'vectorized'
+        vectorized = game.evaluate()
+        game.eval_mode = 'full'
+        assert vectorized == game.evaluate()
+        game.reset()
+
+
+def test_batch_matches_single_positions(engine_cls):
+    game = engine_cls()
+    boards = []
+    for moves in random_positions(30, seed=7):
+        boards.append(play(game, moves).board.copy())
+        game.reset()
+    expected = [game.get_vector_evaluator().evaluate(board) for board in boards]
+    scores = game.get_vector_evaluator().evaluate_batch(np.array(boards))
+    assert [tuple(row) for row in scores.tolist()] == expected
+    assert game.evaluate_positions(np.array(boards)).tolist() == [w - b for b, w in expected]
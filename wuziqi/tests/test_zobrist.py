@@ -0,0 +1,32 @@
+import sys
+
+from conftest import play, random_positions
+from zobrist import ENTRY_BYTES, EXACT, TranspositionTable
+
+
+def test_incremental_hash_matches_full_hash(engine_cls):
+    game = engine_cls()
+    for moves in random_positions(20):
+        play(game, moves)
+        assert game.hash == game.zobrist.hash_board(game.board)
+        for r, c in reversed(moves[len(moves) // 2:]):
+            game.remove_stone(r, c)
+        assert game.hash == game.zobrist.hash_board(game.board)
+        game.reset()
+        assert game.hash == 0
+
+
+def test_full_table_stays_within_memory_cap():
+    tt = TranspositionTable(1)
+    for i in range(len(tt)):
+        tt.store((1 << 63) | (i * 7919 << 20) | i, 6, EXACT, 50000 + i, (i % 15, i // 15 % 15))
+    used = sys.getsizeof(tt.table)
+    seen = set()
+    for entry in tt.table:
+        for obj in (entry,) + entry:
+            if id(obj) not in seen and not (isinstance(obj, int) and -5 <= obj <= 256):
+                seen.add(id(obj))
+                used += sys.getsizeof(obj)
+    assert None not in tt.table
+    assert used <= 1024 * 1024
+    assert len(tt) * ENTRY_BYTES <= 1024 * 1024
@@ -0,0 +1,222 @@
+"""威胁空间搜索：VCF（连续冲四取胜）和 VCT（连续威胁取胜）
+
+只搜索进攻方的冲四/活三着法和防守方的必要应对，分支很窄，
+可以在几毫秒内看到主搜索深度之外 10~20 步的杀棋。
+基于位棋盘做棋型判断，并带有自己的有界缓存表。
+"""
+from bitboard import BitBoard
+
+
+def _indices(mask):
+    """按从小到大的位序枚举掩码中的格子下标"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _count(mask):
+    return bin(mask).count("1")
+
+
+class ThreatSolver:
+    def __init__(self, size=15, max_nodes=3000, memo_size=200000):
+        self.bb = BitBoard(size)
+        self.max_nodes = max_nodes
+        self.memo_size = memo_size
+        self.memo = {}
+        self.nodes = 0  # 本次 find_move 的总节点数
+        self.phase_nodes = 0  # 当前阶段的节点数，每个阶段各有 max_nodes 的预算
+        self.aborted = False
+        self.should_stop = None
+
+    def point(self, index):
+        return divmod(index, self.bb.stride)
+
+    def _place(self, index, player):
+        self.bb.bits[player] |= 1 << index
+
+    def _remove(self, index, player):
+        self.bb.bits[player] &= ~(1 << index)
+
+    def _begin_phase(self):
+        self.phase_nodes = 0
+        self.aborted = False
+
+    def _budget_exceeded(self):
+        self.nodes += 1
+        self.phase_nodes += 1
+        if self.phase_nodes > self.max_nodes:
+            self.aborted = True
+        elif self.should_stop is not None and self.nodes & 63 == 0 and self.should_stop():
+            self.aborted = True
+        return self.aborted
+
+    def _memo_get(self, key, depth):
+        """成功的结果对任意深度有效；失败的结果只对不超过原搜索深度的查询有效"""
+        entry = self.memo.get(key)
+        if entry is None:
+            return False, None
+        stored_depth, line = entry
+        if line is not None or depth <= stored_depth:
+            return True, line
+        return False, None
+
+    def _memo_put(self, key, depth, line):
+        if self.aborted:
+            return  # 因预算中断的结果不可靠
+        if len(self.memo) >= self.memo_size:
+            self.memo.clear()
+        self.memo[key] = (depth, line)
+
+    def vcf(self, attacker, depth):
+        """进攻方连续冲四取胜，返回双方交替的着法序列（格子下标），失败返回 None"""
+        bb = self.bb
+        defender = 3 - attacker
+        wins = bb.five_points(attacker)
+        if wins:
+            return [next(_indices(wins))]
+        # 对方有四时进攻方没有先手
+        if depth <= 0 or bb.five_points(defender):
+            return None
+
+        key = (bb.bits[1], bb.bits[2], attacker, 'vcf')
+        hit, line = self._memo_get(key, depth)
+        if hit:
+            return line
+        if self._budget_exceeded():
+            return None
+
+        result = None
+        for p in _indices(bb.four_points(attacker)):
+            self._place(p, attacker)
+            replies = bb.five_points(attacker)
+            if _count(replies) >= 2:
+                # 活四或双四，防守方无法同时挡住
+                result = [p, next(_indices(replies))]
+            else:
+                q = next(_indices(replies))
+                self._place(q, defender)
+                if not bb.check_win(*self.point(q)):
+                    sub = self.vcf(attacker, depth - 1)
+                    if sub is not None:
+                        result = [p, q] + sub
+                self._remove(q, defender)
+            self._remove(p, attacker)
+            if result is not None or self.aborted:
+                break
+
+        self._memo_put(key, depth, result)
+        return result
+
+    def vct(self, attacker, depth, vcf_depth):
+        """进攻方以冲四和活三连续进攻取胜，返回第一步着法组成的列表，失败返回 None"""
+        bb = self.bb
+        defender = 3 - attacker
+        wins = bb.five_points(attacker)
+        if wins:
+            return [next(_indices(wins))]
+        if bb.five_points(defender):
+            return None
+        line = self.vcf(attacker, vcf_depth)
+        if line is not None:
+            return line
+        # 对方已有活三时只能冲四，VCF 已经失败
+        if depth <= 0 or bb.open_four_points(defender):
+            return None
+
+        key = (bb.bits[1], bb.bits[2], attacker, 'vct')
+        hit, line = self._memo_get(key, depth)
+        if hit:
+            return line
+        if self._budget_exceeded():
+            return None
+
+        result = None
+        threats = bb.three_points(attacker) | bb.four_points(attacker)
+        for p in _indices(threats):
+            self._place(p, attacker)
+            replies = bb.five_points(attacker)
+            if _count(replies) >= 2:
+                result = [p]
+            else:
+                if replies:
+                    defences = replies
+                else:
+                    # 防守活三：成活四点、进攻方其余成四点，以及防守方自己的冲四反击
+                    defences = (bb.open_four_points(attacker) | bb.four_points(attacker)
+                                | bb.four_points(defender))
+                refuted = False
+                for q in _indices(defences):
+                    self._place(q, defender)
+                    if bb.check_win(*self.point(q)):
+                        refuted = True
+                    else:
+                        refuted = self.vct(attacker, depth - 1, vcf_depth) is None
+                    self._remove(q, defender)
+                    if refuted or self.aborted:
+                        break
+                if not refuted and not self.aborted:
+                    result = [p]
+            self._remove(p, attacker)
+            if result is not None or self.aborted:
+                break
+
+        self._memo_put(key, depth, result)
+        return result
+
+    def find_move(self, board, player, vcf_depth=10, vct_depth=3, should_stop=None):
+        """ai_move 搜索前调用：返回 (着法, 类型)，没有把握时返回 (None, None)
+
+        依次检查：己方 VCF、防守对方 VCF、己方 VCT、防守对方 VCT。
+        每个阶段各有 max_nodes 个节点的预算，防守阶段的预算包括验证各个防守点；
+        should_stop() 返回真时中止搜索并返回 (None, None)。
+        """
+        bb = self.bb
+        bb.load(board)
+        opponent = 3 - player
+        self.nodes = 0
+        self.should_stop = should_stop
+        try:
+            self._begin_phase()
+            line = self.vcf(player, vcf_depth)
+            if line is not None:
+                return self.point(line[0]), 'vcf'
+
+            self._begin_phase()
+            line = self.vcf(opponent, vcf_depth)
+            if line is not None:
+                # 候选防守点：对方杀棋的第一步，以及对方所有成四、成五点
+                candidates = [line[0]] + list(_indices(bb.five_points(opponent)
+                                                       | bb.four_points(opponent)))
+                return self._defend(candidates, player, lambda: self.vcf(opponent, vcf_depth))
+
+            self._begin_phase()
+            line = self.vct(player, vct_depth, vcf_depth)
+            if line is not None:
+                return self.point(line[0]), 'vct'
+
+            self._begin_phase()
+            line = self.vct(opponent, vct_depth, vcf_depth)
+            if line is not None:
+                # 候选防守点：对方杀棋的第一步、对方的成四和活三点，以及己方冲四反击
+                candidates = [line[0]] + list(_indices(bb.four_points(opponent)
+                                                       | bb.three_points(opponent)
+                                                       | bb.four_points(player)))
+                return self._defend(candidates, player,
+                                    lambda: self.vct(opponent, vct_depth, vcf_depth))
+            return None, None
+        finally:
+            self.should_stop = None
+
+    def _defend(self, candidates, player, attack):
+        """依次试下候选防守点，返回第一个使 attack() 失败的点；都挡不住或预算用完时返回 (None, None)"""
+        for q in dict.fromkeys(candidates):
+            self._place(q, player)
+            refuted = attack() is None and not self.aborted
+            self._remove(q, player)
+            if refuted:
+                return self.point(q), 'defend'
+            if self.aborted:
+                break
+        return None, None
@@ -1,49 +1,203 @@
+import argparse
+import os
+import threading
 import numpy as np
 import time
+from zobrist import Zobrist, TranspositionTable
+from incremental_eval import IncrementalEvaluator
+from bitboard import BitBoard
+from padded_board import PaddedBoard
+from vector_eval import VectorEvaluator
+from search import choose_move, generate_moves, get_available_moves, minimax
+from move_order import order_moves
+from heuristics import MoveHistory
+from candidates import CandidateSet
+from threat_search import ThreatSolver
+from opening_book import OpeningBook, BOOK_FILE
+from mcts import MCTS
+from pattern_table import LinePatterns
+from records import GameRecordWriter, record_path
 
 class TerminalGomoku:
-    def __init__(self):
-        self.board = np.zeros((15, 15), dtype=int)
+    def __init__(self, tt_mb=16, board_mode='array', candidate_radius=1, size=15):
+        # 棋盘大小与界面无关；着法生成、评估和胜负判断都只与棋子和候选点数量有关
+        self.size = size
+        self.center = size // 2
+        self.board = np.zeros((size, size), dtype=int)
         self.current_player = 1
         self.game_over = False
         self.winner = None
+        self.moves = []  # 本局着法
+        self.recorder = None  # 对局记录（records.GameRecordWriter），终局时写入
         self.depth = 3
         self.symbols = {0: '.', 1: 'X', 2: 'O'}
         
+        # Zobrist 哈希与置换表（tt_mb=0 时关闭）
+        self.zobrist = Zobrist(size)
+        self.hash = 0
+        self.tt = TranspositionTable(tt_mb) if tt_mb else None
+        
+        # 棋盘后端：'array'、'bitboard'（位棋盘负责胜负判断和着法生成）或
+        # 'padded'（带哨兵边框的一维棋盘负责胜负判断、逐格评估和着法生成，结果与 'array' 相同）
+        self.board_mode = board_mode
+        self.bitboard = BitBoard(size) if board_mode == 'bitboard' else None
+        self.padded = PaddedBoard(size) if board_mode == 'padded' else None
+        # 始终维护的位棋盘，供视界处的威胁延伸判断冲四/成五点（bitboard 模式下与 bitboard 共用）
+        self.bits = self.bitboard if self.bitboard is not None else BitBoard(size)
+        
+        # 候选点集合（半径1或2，None 为整盘扫描）
+        self.candidates = CandidateSet(size, candidate_radius) if candidate_radius else None
+        
+        # 搜索预算（秒/节点数），设置后 ai_move 使用迭代加深
+        self.time_limit = None
+        self.node_limit = None
+        self.max_depth = 10
+        # 搜索算法：'alphabeta' 为 minimax，'pvs' 为 negamax 形式的主要变例搜索（迭代加深时带渴望窗口），
+        # 'mcts' 为蒙特卡洛树搜索
+        self.search_mode = 'alphabeta'
+        # 视界处威胁延伸的最大步数（0 为关闭）：只继续搜索成五、冲四和堵四
+        self.quiescence_depth = 4
+        self.aspiration_window = 3000  # 相邻两轮的分数常相差一个活三/冲四的分值
+        self.pv = []  # 最近一次搜索的主要变例
+        # search_mode = 'mcts' 时改用蒙特卡洛树搜索，每步模拟次数（给定时间时只受时间限制）
+        self.mcts_playouts = 2000
+        self.mcts = None
+        self.nodes = 0
+        self.stop_search = False
+        self.search_deadline = None
+        self.search_node_limit = None
+        # 取消搜索用的 threading.Event（由其他线程 set）
+        self.cancel_event = None
+        
+        # 搜索统计（collect_stats 打开时收集，结果在 last_stats / stats_callback / stats_log）
+        self.collect_stats = False
+        self.stats_callback = None
+        self.stats_log = None
+        self.stats = None
+        self.last_stats = None
+        
+        # 着法排序开关与每层候选数上限（None 为不剪枝）
+        self.move_ordering = True
+        self.top_k = None
+        # 杀手着法与历史启发表（None 关闭），ply 为搜索中距根节点的步数
+        self.history = MoveHistory(size)
+        self.ply = 0
+        
+        # 搜索前先用 VCF/VCT 寻找双方的杀棋
+        self.threat_search = True
+        self.vcf_depth = 10   # 进攻方最多连续冲四次数
+        self.vct_depth = 3    # 进攻方最多连续活三次数
+        self.threat_solver = ThreatSolver(size)
+        
+        # 玩家思考时在后台预先搜索最可能的几个应手（终端版 main 使用）
+        self.ponder = True
+        self.ponder_width = 3
+        
+        # 根节点并行搜索的进程数，1 为单进程
+        self.workers = 1
+        self.parallel = None
+        
+        # 开局库（存在 opening_book.bin 时自动加载）
+        self.book = OpeningBook() if os.path.exists(BOOK_FILE) else None
+        if self.book is not None and self.book.size != size:
+            self.book = None  # 开局库只适用于生成它的棋盘大小
+        
+        # 评估方式：'incremental' 增量评估，'full' 全盘扫描，'vectorized' NumPy 整盘扫描
+        # 查表下标 [连续数][空端数]，与 evaluate_position 的分值一致
+        self.eval_mode = 'incremental'
+        self.run_scores = [
+            [0, 0, 0],
+            [0, 0, 50],
+            [0, 100, 500],
+            [0, 1000, 5000],
+            [10000] * 3,
+        ]
+        self.evaluator = IncrementalEvaluator(size, self.run_scores)
+        self.vector_evaluator = None
+        
+        # 棋型查表（按 CLASS_NAMES 顺序的分值），着法排序的 evaluate_position 用它代替逐格数子；
+        # 三种评估方式都按连续棋子计分（run_score），分值一致
+        self.use_pattern_table = True
+        self.patterns = LinePatterns(size, [0, 0, 0, 50, 100, 500, 1000, 5000, 10000])
+        
         # 方向：水平、垂直、对角线（左上到右下）、对角线（左下到右上）
         self.directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
     
     def reset(self):
-        self.board = np.zeros((15, 15), dtype=int)
+        self.board = np.zeros((self.size, self.size), dtype=int)
         self.current_player = 1
         self.game_over = False
         self.winner = None
+        self.moves = []
+        self.hash = 0
+        self.evaluator.reset()
+        if self.history is not None:
+            self.history.clear()
+        self.patterns.reset()
+        self.bits.reset()
+        if self.padded is not None:
+            self.padded.reset()
+        if self.candidates is not None:
+            self.candidates.reset()
+        if self.tt is not None:
+            self.tt.clear()
+    
+    def place_stone(self, row, col, player):
+        self.board[row][col] = player
+        self.hash ^= self.zobrist.key(row, col, player)
+        self.evaluator.place(row, col, player)
+        self.patterns.place(row, col, player)
+        self.bits.place(row, col, player)
+        if self.padded is not None:
+            self.padded.place(row, col, player)
+        if self.candidates is not None:
+            self.candidates.place(row, col)
+    
+    def remove_stone(self, row, col):
+        player = self.board[row][col]
+        self.board[row][col] = 0
+        self.hash ^= self.zobrist.key(row, col, player)
+        self.evaluator.remove(row, col, player)
+        self.patterns.remove(row, col)
+        self.bits.remove(row, col, player)
+        if self.padded is not None:
+            self.padded.remove(row, col, player)
+        if self.candidates is not None:
+            self.candidates.remove(row, col)
     
     def print_board(self):
         print("\n" + "="*40)
-        print("   " + " ".join([f"{i:2}" for i in range(15)]))
-        for i in range(15):
+        print("   " + " ".join([f"{i:2}" for i in range(self.size)]))
+        for i in range(self.size):
             print(f"{i:2} ", end="")
-            for j in range(15):
+            for j in range(self.size):
                 print(f" {self.symbols[self.board[i, j]]}", end="")
             print()
         print("="*40)
     
     def make_move(self, row, col):
-        if 0 <= row < 15 and 0 <= col < 15 and self.board[row, col] == 0:
-            self.board[row, col] = self.current_player
+        if 0 <= row < self.size and 0 <= col < self.size and self.board[row, col] == 0:
+            self.place_stone(row, col, self.current_player)
+            self.moves.append((row, col))
             
             if self.check_win(row, col):
                 self.game_over = True
                 self.winner = self.current_player
-            elif np.count_nonzero(self.board) == 15*15:
+            elif np.count_nonzero(self.board) == self.size * self.size:
                 self.game_over = True
             else:
                 self.current_player = 3 - self.current_player
+            if self.game_over and self.recorder is not None:
+                self.recorder.write(self.moves, self.winner or 0)
             return True
         return False
     
     def check_win(self, row, col):
+        if self.bitboard is not None:
+            return self.bitboard.check_win(row, col)
+        if self.padded is not None:
+            return self.padded.check_win(row, col)
+        
         player = self.board[row][col]
         
         for dx, dy in self.directions:
@@ -51,14 +205,14 @@ class TerminalGomoku:
             
             # 正向检查
             r, c = row + dx, col + dy
-            while 0 <= r < 15 and 0 <= c < 15 and self.board[r][c] == player:
+            while 0 <= r < self.size and 0 <= c < self.size and self.board[r][c] == player:
                 count += 1
                 r += dx
                 c += dy
             
             # 反向检查
             r, c = row - dx, col - dy
-            while 0 <= r < 15 and 0 <= c < 15 and self.board[r][c] == player:
+            while 0 <= r < self.size and 0 <= c < self.size and self.board[r][c] == player:
                 count += 1
                 r -= dx
                 c -= dy
@@ -69,6 +223,15 @@ class TerminalGomoku:
         return False
     
     def evaluate_position(self, row, col, player):
+        if self.use_pattern_table:
+            return self.patterns.evaluate_position(row, col, player)
+        return self.run_score(row, col, player)
+    
+    def run_score(self, row, col, player):
+        """按连续棋子数和空端数计分（与 'incremental'、'vectorized' 评估的分值一致）"""
+        if self.padded is not None:
+            return self.padded.evaluate_position(row, col, player, self.evaluator.run_scores)
+        
         score = 0
         
         for dx, dy in self.directions:
@@ -77,7 +240,7 @@ class TerminalGomoku:
             
             # 正向检查
             r, c = row + dx, col + dy
-            while 0 <= r < 15 and 0 <= c < 15:
+            while 0 <= r < self.size and 0 <= c < self.size:
                 if self.board[r][c] == player:
                     count += 1
                 elif self.board[r][c] == 0:
@@ -90,7 +253,7 @@ class TerminalGomoku:
             
             # 反向检查
             r, c = row - dx, col - dy
-            while 0 <= r < 15 and 0 <= c < 15:
+            while 0 <= r < self.size and 0 <= c < self.size:
                 if self.board[r][c] == player:
                     count += 1
                 elif self.board[r][c] == 0:
@@ -123,110 +286,152 @@ class TerminalGomoku:
     def evaluate_board(self, player):
         score = 0
         
-        for r in range(15):
-            for c in range(15):
-                if self.board[r][c] == player:
-                    dist = abs(r-7) + abs(c-7)
-                    center_bonus = max(0, 10 - dist)
-                    score += center_bonus
-                    score += self.evaluate_position(r, c, player)
+        # 只遍历该方的棋子，代价与棋子数成正比
+        for r, c in np.argwhere(self.board == player).tolist():
+            dist = abs(r - self.center) + abs(c - self.center)
+            center_bonus = max(0, 10 - dist)
+            score += center_bonus
+            score += self.run_score(r, c, player)
         
         return score
     
+    def evaluate(self):
+        if self.stats is not None:
+            self.stats.eval_calls += 1
+        if self.eval_mode == 'incremental':
+            return self.evaluator.score(2) - self.evaluator.score(1)
+        if self.eval_mode == 'vectorized':
+            black, white = self.get_vector_evaluator().evaluate(self.board)
+            return white - black
+        return self.evaluate_board(2) - self.evaluate_board(1)
+    
+    def get_mcts(self):
+        if self.mcts is None:
+            self.mcts = MCTS(self.size, self.mcts_playouts)
+        return self.mcts
+    
+    def get_vector_evaluator(self):
+        if self.vector_evaluator is None:
+            self.vector_evaluator = VectorEvaluator(self.size, self.run_scores)
+        return self.vector_evaluator
+    
+    def evaluate_positions(self, boards):
+        """批量评估 (N, size, size) 的静态局面，返回AI视角的分数数组"""
+        scores = self.get_vector_evaluator().evaluate_batch(boards)
+        return scores[:, 1] - scores[:, 0]
+    
     def get_available_moves(self):
-        moves = []
-        
-        if np.any(self.board):
-            for r in range(15):
-                for c in range(15):
-                    if self.board[r][c] == 0:
-                        for dr in range(-1, 2):
-                            for dc in range(-1, 2):
-                                nr, nc = r + dr, c + dc
-                                if 0 <= nr < 15 and 0 <= nc < 15 and self.board[nr][nc] != 0:
-                                    moves.append((r, c))
-                                    break
-        else:
-            moves.append((7, 7))
-        
-        return moves
+        """获取所有可行的落子位置（只考虑有棋子周围的点）"""
+        return get_available_moves(self)
     
-    def minimax(self, depth, alpha, beta, maximizing_player):
-        if depth == 0 or self.game_over:
-            player_score = self.evaluate_board(2)
-            opponent_score = self.evaluate_board(1)
-            return player_score - opponent_score, None
-        
-        moves = self.get_available_moves()
-        if not moves:
-            return 0, None
-        
-        best_move = None
-        
-        if maximizing_player:
-            max_eval = float('-inf')
-            for move in moves:
-                r, c = move
-                self.board[r][c] = 2
-                prev_state = self.game_over
-                self.game_over = self.check_win(r, c)
-                
-                eval_score, _ = self.minimax(depth-1, alpha, beta, False)
-                
-                self.board[r][c] = 0
-                self.game_over = prev_state
-                
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_move = move
-                
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            
-            return max_eval, best_move
-        
-        else:
-            min_eval = float('inf')
-            for move in moves:
-                r, c = move
-                self.board[r][c] = 1
-                prev_state = self.game_over
-                self.game_over = self.check_win(r, c)
-                
-                eval_score, _ = self.minimax(depth-1, alpha, beta, True)
-                
-                self.board[r][c] = 0
-                self.game_over = prev_state
-                
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_move = move
-                
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            
-            return min_eval, best_move
+    def generate_moves(self, player):
+        """搜索用的着法生成：按进攻+防守启发分排序，必胜/必堵时只返回这些着法"""
+        return generate_moves(self, player)
     
-    def ai_move(self):
+    def minimax(self, depth, alpha, beta, maximizing_player, first_move=None):
+        """极小极大算法，带α-β剪枝和置换表"""
+        return minimax(self, depth, alpha, beta, maximizing_player, first_move)
+    
+    def choose_move(self, time_limit=None, node_limit=None, speculative=False):
+        """选择AI着法但不落子，返回 (着法, 说明)，见 search.choose_move"""
+        return choose_move(self, time_limit, node_limit, speculative)
+    
+    def ai_move(self, time_limit=None, node_limit=None):
         start = time.time()
-        _, move = self.minimax(self.depth, float('-inf'), float('inf'), True)
+        move, info = self.choose_move(time_limit, node_limit)
         
         if move:
             r, c = move
             self.make_move(r, c)
-            print(f"AI落子: ({r}, {c}), 思考时间: {time.time()-start:.2f}秒")
+            print(f"AI落子: ({r}, {c}), {info}, 思考时间: {time.time()-start:.2f}秒")
             return True
         return False
 
+class Ponderer:
+    """玩家输入时在后台线程中预先思考
+
+    依次假设玩家走出最可能的几个应手（上一步主要变例中的应手优先，其余按着法排序），
+    用与正式走棋相同的设置为每个局面搜索AI的着法，结果按落子后的 Zobrist 哈希缓存。
+    玩家走了猜中的着法时直接使用缓存结果；没猜中时置换表中的结果也能加快正式搜索。
+    搜索直接在 game 上进行，因此读取玩家输入后必须先 stop() 再落子。
+    """
+    
+    def __init__(self, game):
+        self.game = game
+        self.thread = None
+        self.cancel_event = None
+        self.cache = {}
+        self.hits = 0
+    
+    def start(self):
+        self.stop()
+        self.cache = {}
+        self.cancel_event = threading.Event()
+        self.game.cancel_event = self.cancel_event
+        self.thread = threading.Thread(target=self._run, args=(self.cancel_event,), daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        if self.thread is not None:
+            self.cancel_event.set()
+            self.thread.join()
+            self.thread = None
+            self.game.cancel_event = None
+    
+    def predictions(self):
+        game = self.game
+        moves = [tuple(m) for m in game.pv[1:2] if game.board[m[0]][m[1]] == 0]
+        candidates = order_moves(game, game.get_available_moves(), 1)
+        moves += [m for m in candidates if m not in moves]
+        return moves[:game.ponder_width]
+    
+    def _run(self, cancel_event):
+        game = self.game
+        for r, c in self.predictions():
+            if cancel_event.is_set():
+                break
+            game.place_stone(r, c, 1)
+            if not game.check_win(r, c):
+                key = game.hash
+                result = game.choose_move(speculative=True)
+                if not cancel_event.is_set():
+                    self.cache[key] = (result, game.pv)
+            game.remove_stone(r, c)
+    
+    def input(self, prompt):
+        """等待玩家输入，期间在后台思考"""
+        self.start()
+        try:
+            return input(prompt)
+        finally:
+            self.stop()
+    
+    def take(self):
+        """玩家落子后调用：猜中时返回缓存的 (着法, 说明)，否则返回 None"""
+        entry = self.cache.pop(self.game.hash, None)
+        self.cache = {}
+        if entry is None:
+            return None
+        self.hits += 1
+        # 试探性搜索不老化历史表，命中时代替 choose_move 为这一步老化一次
+        if self.game.history is not None:
+            self.game.history.age()
+        result, self.game.pv = entry
+        return result
+
 def main():
-    game = TerminalGomoku()
+    parser = argparse.ArgumentParser(description="五子棋 - 终端版")
+    parser.add_argument('--size', type=int, default=15, help="棋盘大小（如 15、19、25）")
+    args = parser.parse_args()
+    
+    game = TerminalGomoku(size=args.size)
+    game.recorder = GameRecordWriter(record_path(game.size), game.size)
+    ponderer = Ponderer(game) if game.ponder else None
     
     print("="*50)
     print("五子棋游戏 - 终端版")
     print("玩家: X, AI: O")
-    print("输入坐标格式: 行 列 (例如: 7 7)")
+    print(f"输入坐标格式: 行 列 (例如: {game.center} {game.center})")
     print("="*50)
     
     while True:
@@ -239,25 +444,34 @@ def main():
                 print("AI赢了！")
             else:
                 print("平局！")
+            game.recorder.flush()
             
             restart = input("再玩一局? (y/n): ").lower()
             if restart == 'y':
                 game.reset()
                 continue
             else:
+                game.recorder.close()
                 break
         
         if game.current_player == 1:  # 玩家回合
             try:
-                move = input("你的回合 (输入坐标, 例如'7 7'): ")
+                prompt = f"你的回合 (输入坐标, 例如'{game.center} {game.center}'): "
+                move = ponderer.input(prompt) if ponderer is not None else input(prompt)
                 row, col = map(int, move.split())
                 if not game.make_move(row, col):
                     print("无效落子，请重试!")
             except:
                 print("输入格式错误，请使用'行 列'格式")
         else:  # AI回合
-            print("AI思考中...")
-            game.ai_move()
+            hit = ponderer.take() if ponderer is not None else None
+            if hit is not None and hit[0] is not None:
+                r, c = hit[0]
+                game.make_move(r, c)
+                print(f"AI落子: ({r}, {c}), {hit[1]}, 后台思考命中")
+            else:
+                print("AI思考中...")
+                game.ai_move()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,7 +6,21 @@ import pygame
 import sys
 import numpy as np
 import time
+import threading
 from collections import defaultdict
+from zobrist import Zobrist, TranspositionTable
+from incremental_eval import IncrementalEvaluator
+from bitboard import BitBoard
+from padded_board import PaddedBoard
+from vector_eval import VectorEvaluator
+from search import choose_move, generate_moves, get_available_moves, minimax
+from heuristics import MoveHistory
+from candidates import CandidateSet
+from threat_search import ThreatSolver
+from opening_book import OpeningBook, BOOK_FILE
+from mcts import MCTS
+from pattern_table import LinePatterns, CLASS_NAMES
+from records import GameRecordWriter, record_path
 
 # 初始化pygame
 pygame.init()
@@ -40,14 +54,87 @@ except pygame.error as e:
         sys.exit(1)
 
 class GomokuGame:
-    def __init__(self):
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)  # 0:空, 1:黑, 2:白
+    def __init__(self, tt_mb=16, board_mode='array', candidate_radius=1, size=BOARD_SIZE):
+        # 引擎的棋盘大小与窗口无关（默认与界面一致）；着法生成、评估和胜负判断的代价
+        # 只与棋子和候选点数量有关，19、25 路棋盘同样适用
+        self.size = size
+        self.center = size // 2
+        self.board = np.zeros((size, size), dtype=int)  # 0:空, 1:黑, 2:白
         self.current_player = 1  # 黑棋先行
         self.game_over = False
         self.winner = None
+        self.moves = []  # 本局着法
+        self.recorder = None  # 对局记录（records.GameRecordWriter），终局时写入
         self.last_move = None
         self.depth = 2  # 减小搜索深度以提高性能
         
+        # Zobrist 哈希与置换表（tt_mb=0 时关闭置换表）
+        self.zobrist = Zobrist(size)
+        self.hash = 0
+        self.tt = TranspositionTable(tt_mb) if tt_mb else None
+        
+        # 棋盘后端：'array' 只用数组，'bitboard' 额外维护位棋盘用于胜负判断和着法生成，
+        # 'padded' 额外维护带哨兵边框的一维棋盘，胜负判断、逐格评估和着法生成不再检查越界
+        self.board_mode = board_mode
+        self.bitboard = BitBoard(size) if board_mode == 'bitboard' else None
+        self.padded = PaddedBoard(size) if board_mode == 'padded' else None
+        # 始终维护的位棋盘，供视界处的威胁延伸判断冲四/成五点（bitboard 模式下与 bitboard 共用）
+        self.bits = self.bitboard if self.bitboard is not None else BitBoard(size)
+        
+        # 增量维护的候选点集合（半径1或2），None 表示每次整盘扫描
+        self.candidates = CandidateSet(size, candidate_radius) if candidate_radius else None
+        
+        # 搜索预算：设置 time_limit（秒）或 node_limit 后 ai_move 改用迭代加深
+        self.time_limit = None
+        self.node_limit = None
+        self.max_depth = 10
+        # 搜索算法：'alphabeta' 为 minimax，'pvs' 为 negamax 形式的主要变例搜索（迭代加深时带渴望窗口），
+        # 'mcts' 为蒙特卡洛树搜索
+        self.search_mode = 'alphabeta'
+        # 视界处威胁延伸的最大步数（0 为关闭）：只继续搜索成五、冲四和堵四
+        self.quiescence_depth = 4
+        self.aspiration_window = 3000  # 相邻两轮的分数常相差一个活三/冲四的分值
+        self.pv = []  # 最近一次搜索的主要变例
+        # search_mode = 'mcts' 时改用蒙特卡洛树搜索，每步模拟次数（给定时间时只受时间限制）
+        self.mcts_playouts = 2000
+        self.mcts = None
+        self.nodes = 0
+        self.stop_search = False
+        self.search_deadline = None
+        self.search_node_limit = None
+        # 其他线程可 set() 此事件来中止正在进行的搜索
+        self.cancel_event = None
+        
+        # 搜索统计：collect_stats 打开后每步生成 SearchStats，存于 last_stats，
+        # 并可交给 stats_callback 或追加写入 stats_log（JSON-lines）
+        self.collect_stats = False
+        self.stats_callback = None
+        self.stats_log = None
+        self.stats = None
+        self.last_stats = None
+        
+        # 着法排序开关（便于对比搜索节点数），top_k 为每层保留的候选数，None 表示不剪枝
+        self.move_ordering = True
+        self.top_k = None
+        # 杀手着法与历史启发表（None 关闭），ply 为搜索中距根节点的步数
+        self.history = MoveHistory(size)
+        self.ply = 0
+        
+        # 威胁空间搜索（VCF/VCT）：在全宽搜索前寻找双方的连续冲四/活三杀棋
+        self.threat_search = True
+        self.vcf_depth = 10   # 进攻方最多连续冲四次数
+        self.vct_depth = 3    # 进攻方最多连续活三次数
+        self.threat_solver = ThreatSolver(size)
+        
+        # 根节点并行搜索的进程数（固定深度搜索时生效），1 表示单进程
+        self.workers = 1
+        self.parallel = None
+        
+        # 开局库：存在 opening_book.bin 时自动加载（内存映射，不占启动时间）
+        self.book = OpeningBook() if os.path.exists(BOOK_FILE) else None
+        if self.book is not None and self.book.size != size:
+            self.book = None  # 开局库只适用于生成它的棋盘大小
+        
         # 方向：水平、垂直、对角线（左上到右下）、对角线（左下到右上）
         self.directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         
@@ -62,43 +149,113 @@ class GomokuGame:
             'half_two': 50,       # 眠二
             'single': 10          # 单子
         }
+        
+        # 评估方式：'incremental' 增量评估，'full' 每个叶子全盘扫描，
+        # 'vectorized' 用 NumPy 整盘扫描（用于分析和批量评估）
+        self.eval_mode = 'incremental'
+        self.evaluator = IncrementalEvaluator(size, self.run_score_table())
+        self.vector_evaluator = None
+        
+        # 棋型查表：evaluate_position 每个方向一次查表，并能识别跳子棋型
+        # （只用于着法排序；三种评估方式都按连续棋子计分（run_score），分值一致）
+        self.use_pattern_table = True
+        self.patterns = LinePatterns(size, [0] + [self.pattern_scores[name]
+                                                        for name in CLASS_NAMES[1:]])
+    
+    def run_score_table(self):
+        """把 pattern_scores 转为 [连续数][空端数] 查表，与 evaluate_position 的判断一致"""
+        s = self.pattern_scores
+        return [
+            [0, 0, 0],
+            [0, s['half_two'], s['open_two']],
+            [0, s['half_three'], s['open_three']],
+            [0, s['half_four'], s['open_four']],
+            [s['five']] * 3,
+        ]
     
     def reset(self):
         """重置游戏"""
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        self.board = np.zeros((self.size, self.size), dtype=int)
         self.current_player = 1
         self.game_over = False
         self.winner = None
+        self.moves = []
         self.last_move = None
+        self.hash = 0
+        self.evaluator.reset()
+        if self.history is not None:
+            self.history.clear()
+        self.patterns.reset()
+        self.bits.reset()
+        if self.padded is not None:
+            self.padded.reset()
+        if self.candidates is not None:
+            self.candidates.reset()
+        if self.tt is not None:
+            self.tt.clear()
+    
+    def place_stone(self, row, col, player):
+        """放置棋子并更新哈希（搜索中的make）"""
+        self.board[row][col] = player
+        self.hash ^= self.zobrist.key(row, col, player)
+        self.evaluator.place(row, col, player)
+        self.patterns.place(row, col, player)
+        self.bits.place(row, col, player)
+        if self.padded is not None:
+            self.padded.place(row, col, player)
+        if self.candidates is not None:
+            self.candidates.place(row, col)
+    
+    def remove_stone(self, row, col):
+        """移除棋子并更新哈希（搜索中的unmake）"""
+        player = self.board[row][col]
+        self.board[row][col] = 0
+        self.hash ^= self.zobrist.key(row, col, player)
+        self.evaluator.remove(row, col, player)
+        self.patterns.remove(row, col)
+        self.bits.remove(row, col, player)
+        if self.padded is not None:
+            self.padded.remove(row, col, player)
+        if self.candidates is not None:
+            self.candidates.remove(row, col)
     
     def make_move(self, row, col):
         """在指定位置落子"""
         if self.is_valid_move(row, col):
-            self.board[row][col] = self.current_player
+            self.place_stone(row, col, self.current_player)
             self.last_move = (row, col)
+            self.moves.append((row, col))
             
             # 检查是否获胜
             if self.check_win(row, col):
                 self.game_over = True
                 self.winner = self.current_player
             # 检查是否平局
-            elif np.count_nonzero(self.board) == BOARD_SIZE * BOARD_SIZE:
+            elif np.count_nonzero(self.board) == self.size * self.size:
                 self.game_over = True
             else:
                 # 切换玩家
                 self.current_player = 3 - self.current_player  # 1->2, 2->1
             
+            # 终局时写入对局记录
+            if self.game_over and self.recorder is not None:
+                self.recorder.write(self.moves, self.winner or 0)
             return True
         return False
     
     def is_valid_move(self, row, col):
         """检查落子是否有效"""
-        return (0 <= row < BOARD_SIZE and 
-                0 <= col < BOARD_SIZE and 
+        return (0 <= row < self.size and 
+                0 <= col < self.size and 
                 self.board[row][col] == 0)
     
     def check_win(self, row, col):
         """检查是否有玩家获胜"""
+        if self.bitboard is not None:
+            return self.bitboard.check_win(row, col)
+        if self.padded is not None:
+            return self.padded.check_win(row, col)
+        
         player = self.board[row][col]
         
         for dx, dy in self.directions:
@@ -106,14 +263,14 @@ class GomokuGame:
             
             # 正向检查
             r, c = row + dx, col + dy
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and self.board[r][c] == player:
+            while 0 <= r < self.size and 0 <= c < self.size and self.board[r][c] == player:
                 count += 1
                 r += dx
                 c += dy
             
             # 反向检查
             r, c = row - dx, col - dy
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and self.board[r][c] == player:
+            while 0 <= r < self.size and 0 <= c < self.size and self.board[r][c] == player:
                 count += 1
                 r -= dx
                 c -= dy
@@ -125,6 +282,15 @@ class GomokuGame:
     
     def evaluate_position(self, row, col, player):
         """评估单个位置的得分 - 简化版本"""
+        if self.use_pattern_table:
+            return self.patterns.evaluate_position(row, col, player)
+        return self.run_score(row, col, player)
+    
+    def run_score(self, row, col, player):
+        """按连续棋子数和空端数计分（与 'incremental'、'vectorized' 评估的分值一致）"""
+        if self.padded is not None:
+            return self.padded.evaluate_position(row, col, player, self.evaluator.run_scores)
+        
         score = 0
         
         # 简化的评估函数，只检查四个方向
@@ -134,7 +300,7 @@ class GomokuGame:
             
             # 正向检查
             r, c = row + dx, col + dy
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+            while 0 <= r < self.size and 0 <= c < self.size:
                 if self.board[r][c] == player:
                     count += 1
                 elif self.board[r][c] == 0:
@@ -147,7 +313,7 @@ class GomokuGame:
             
             # 反向检查
             r, c = row - dx, col - dy
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+            while 0 <= r < self.size and 0 <= c < self.size:
                 if self.board[r][c] == player:
                     count += 1
                 elif self.board[r][c] == 0:
@@ -183,232 +349,315 @@ class GomokuGame:
         """评估整个棋盘的得分 - 简化版本"""
         score = 0
         
-        # 只评估有棋子的位置
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.board[r][c] == player:
-                    # 中心位置加成
-                    dist_to_center = abs(r - BOARD_SIZE//2) + abs(c - BOARD_SIZE//2)
-                    center_value = max(0, 10 - dist_to_center)
-                    score += center_value
-                    
-                    # 评估单个位置的得分
-                    score += self.evaluate_position(r, c, player)
+        # 只评估有棋子的位置（只遍历该方的棋子，代价与棋子数成正比）
+        for r, c in np.argwhere(self.board == player).tolist():
+            # 中心位置加成
+            dist_to_center = abs(r - self.center) + abs(c - self.center)
+            center_value = max(0, 10 - dist_to_center)
+            score += center_value
+            
+            # 评估单个位置的得分
+            score += self.run_score(r, c, player)
         
         return score
     
+    def evaluate(self):
+        """当前局面的评估分（电脑白棋视角）"""
+        if self.stats is not None:
+            self.stats.eval_calls += 1
+        if self.eval_mode == 'incremental':
+            return self.evaluator.score(2) - self.evaluator.score(1)
+        if self.eval_mode == 'vectorized':
+            black, white = self.get_vector_evaluator().evaluate(self.board)
+            return white - black
+        return self.evaluate_board(2) - self.evaluate_board(1)
+    
+    def get_mcts(self):
+        if self.mcts is None:
+            self.mcts = MCTS(self.size, self.mcts_playouts)
+        return self.mcts
+    
+    def get_vector_evaluator(self):
+        """首次使用时才构建向量化评估器的查表"""
+        if self.vector_evaluator is None:
+            self.vector_evaluator = VectorEvaluator(self.size, self.run_score_table())
+        return self.vector_evaluator
+    
+    def evaluate_positions(self, boards):
+        """批量评估多个静态局面，返回每个局面的评估分（电脑白棋视角）"""
+        scores = self.get_vector_evaluator().evaluate_batch(boards)
+        return scores[:, 1] - scores[:, 0]
+    
     def get_available_moves(self):
         """获取所有可行的落子位置（只考虑有棋子周围的点）"""
-        moves = []
-        
-        # 如果有棋子，只考虑棋子周围的点
-        if np.any(self.board):
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if self.board[r][c] == 0:
-                        # 检查周围是否有棋子
-                        for dr in range(-1, 2):
-                            for dc in range(-1, 2):
-                                if dr == 0 and dc == 0:
-                                    continue
-                                nr, nc = r + dr, c + dc
-                                if 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
-                                    if self.board[nr][nc] != 0:
-                                        moves.append((r, c))
-                                        break
-        else:
-            # 棋盘为空，选择中心点
-            moves.append((BOARD_SIZE//2, BOARD_SIZE//2))
-        
-        return moves
+        return get_available_moves(self)
     
-    def minimax(self, depth, alpha, beta, maximizing_player):
-        """极小极大算法，带α-β剪枝 - 简化版本"""
-        # 游戏结束或达到搜索深度
-        if depth == 0 or self.game_over:
-            player_score = self.evaluate_board(2)  # 电脑是白棋(2)
-            opponent_score = self.evaluate_board(1)  # 玩家是黑棋(1)
-            return player_score - opponent_score, None
-        
-        moves = self.get_available_moves()
-        if not moves:
-            return 0, None
-        
-        best_move = None
-        
-        if maximizing_player:  # 电脑（最大化）
-            max_eval = float('-inf')
-            for move in moves:
-                r, c = move
-                self.board[r][c] = 2  # 电脑落白棋
-                prev_game_over = self.game_over
-                self.game_over = self.check_win(r, c)
-                
-                eval_score, _ = self.minimax(depth - 1, alpha, beta, False)
-                
-                self.board[r][c] = 0  # 撤销落子
-                self.game_over = prev_game_over
-                
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_move = move
-                
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break  # α-β剪枝
-            
-            return max_eval, best_move
-        
-        else:  # 玩家（最小化）
-            min_eval = float('inf')
-            for move in moves:
-                r, c = move
-                self.board[r][c] = 1  # 玩家落黑棋
-                prev_game_over = self.game_over
-                self.game_over = self.check_win(r, c)
-                
-                eval_score, _ = self.minimax(depth - 1, alpha, beta, True)
-                
-                self.board[r][c] = 0  # 撤销落子
-                self.game_over = prev_game_over
-                
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_move = move
-                
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break  # α-β剪枝
-            
-            return min_eval, best_move
+    def generate_moves(self, player):
+        """搜索用的着法生成：按进攻+防守启发分排序，必胜/必堵时只返回这些着法"""
+        return generate_moves(self, player)
+    
+    def minimax(self, depth, alpha, beta, maximizing_player, first_move=None):
+        """极小极大算法，带α-β剪枝和置换表"""
+        return minimax(self, depth, alpha, beta, maximizing_player, first_move)
     
-    def ai_move(self):
-        """AI进行移动 - 简化版本"""
+    def choose_move(self, time_limit=None, node_limit=None):
+        """为AI（白棋）选择着法但不落子，返回 (着法, 说明)，见 search.choose_move"""
+        return choose_move(self, time_limit, node_limit)
+    
+    def ai_move(self, time_limit=None, node_limit=None):
+        """AI进行移动"""
         start_time = time.time()
-        _, move = self.minimax(self.depth, float('-inf'), float('inf'), True)
+        move, info = self.choose_move(time_limit, node_limit)
         
         if move:
             r, c = move
             self.make_move(r, c)
-            print(f"AI思考时间: {time.time() - start_time:.2f}秒")
+            print(f"AI思考时间: {time.time() - start_time:.2f}秒 ({info})")
             return True
         return False
 
-# 创建游戏实例
-game = GomokuGame()
+class AIWorker:
+    """在后台线程中为界面运行AI搜索，可随时取消
 
-# 绘制棋盘
-def draw_board():
-    try:
-        screen.fill(BACKGROUND_COLOR)
-    except pygame.error:
-        return
+    搜索使用独立的引擎实例，避免搜索中临时落下的棋子被界面画出来；
+    该引擎在多步之间保留置换表，每次开始前只同步与界面棋盘不同的格子。
+    """
     
-    try:
-        # 绘制网格线
-        for i in range(BOARD_SIZE):
-            # 横线
-            pygame.draw.line(screen, LINE_COLOR, 
-                            (MARGIN, MARGIN + i * GRID_SIZE), 
-                            (MARGIN + (BOARD_SIZE - 1) * GRID_SIZE, MARGIN + i * GRID_SIZE), 
-                            2)
-            # 竖线
-            pygame.draw.line(screen, LINE_COLOR, 
-                            (MARGIN + i * GRID_SIZE, MARGIN), 
-                            (MARGIN + i * GRID_SIZE, MARGIN + (BOARD_SIZE - 1) * GRID_SIZE), 
-                            2)
-    except pygame.error:
-        pass
+    def __init__(self, size=BOARD_SIZE):
+        self.engine = GomokuGame(size=size)
+        self.thread = None
+        self.cancel_event = None
+        self.result = None
     
-    # 绘制棋子
-    for r in range(BOARD_SIZE):
-        for c in range(BOARD_SIZE):
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+    
+    def start(self, game):
+        if self.thread is not None:
+            self.thread.join()  # 已取消的上一次搜索很快就会退出
+        engine = self.engine
+        for r, c in np.argwhere(engine.board != game.board).tolist():
+            if engine.board[r][c]:
+                engine.remove_stone(r, c)
+            if game.board[r][c]:
+                engine.place_stone(r, c, int(game.board[r][c]))
+        engine.game_over = False
+        engine.current_player = 2
+        engine.depth = game.depth
+        engine.time_limit = game.time_limit
+        engine.node_limit = game.node_limit
+        
+        self.cancel_event = threading.Event()
+        engine.cancel_event = self.cancel_event
+        self.result = None
+        self.thread = threading.Thread(target=self._run, args=(self.cancel_event,), daemon=True)
+        self.thread.start()
+    
+    def _run(self, cancel_event):
+        start_time = time.time()
+        move, info = self.engine.choose_move()
+        # 结果与所属搜索的取消事件一起保存：即使 cancel() 恰好发生在此之后，
+        # take_result() 也能识别并丢弃过期的结果
+        self.result = (cancel_event, (move, info, time.time() - start_time))
+        if not cancel_event.is_set():
             try:
-                if game.board[r][c] == 1:  # 黑棋
-                    pygame.draw.circle(screen, BLACK, 
-                                    (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE), 
-                                    GRID_SIZE // 2 - 2)
-                elif game.board[r][c] == 2:  # 白棋
-                    pygame.draw.circle(screen, WHITE, 
-                                    (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE), 
-                                    GRID_SIZE // 2 - 2)
-                    pygame.draw.circle(screen, BLACK, 
-                                    (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE), 
-                                    GRID_SIZE // 2 - 2, 1)  # 白色棋子加黑色边框
+                pygame.event.post(pygame.event.Event(AI_DONE_EVENT))
             except pygame.error:
                 pass
     
-    # 标记最后一步
-    if game.last_move:
-        r, c = game.last_move
+    def cancel(self):
+        """中止当前搜索，结果将被丢弃"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.result = None
+    
+    def take_result(self):
+        """搜索完成时返回 (着法, 说明, 耗时) 并清空，否则返回 None；已取消的搜索结果被丢弃"""
+        if self.busy() or self.result is None:
+            return None
+        cancel_event, result = self.result
+        self.result = None
+        if cancel_event.is_set():
+            return None
+        return result
+
+# 创建游戏实例
+game = GomokuGame()
+
+# 自定义事件：AI搜索完成、思考动画刷新
+AI_DONE_EVENT = pygame.USEREVENT + 1
+THINK_TICK_EVENT = pygame.USEREVENT + 2
+
+class BoardRenderer:
+    """缓存式绘制：网格预先画在背景层上，字体和状态文字缓存，
+    每次只重画发生变化的格子和状态栏，并用 display.update(rects) 提交"""
+    
+    def __init__(self, surface):
+        self.surface = surface
+        self.background = pygame.Surface(surface.get_size())
+        self.background.fill(BACKGROUND_COLOR)
         try:
-            pygame.draw.circle(screen, RED, 
-                            (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE), 
-                            5)
+            # 绘制网格线
+            for i in range(BOARD_SIZE):
+                # 横线
+                pygame.draw.line(self.background, LINE_COLOR, 
+                                (MARGIN, MARGIN + i * GRID_SIZE), 
+                                (MARGIN + (BOARD_SIZE - 1) * GRID_SIZE, MARGIN + i * GRID_SIZE), 
+                                2)
+                # 竖线
+                pygame.draw.line(self.background, LINE_COLOR, 
+                                (MARGIN + i * GRID_SIZE, MARGIN), 
+                                (MARGIN + i * GRID_SIZE, MARGIN + (BOARD_SIZE - 1) * GRID_SIZE), 
+                                2)
         except pygame.error:
             pass
+        
+        self.font = pygame.font.SysFont(None, 30)
+        self.text_cache = {}
+        # 屏幕上当前画着的内容，用于找出需要重画的区域
+        self.drawn = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        self.drawn_last_move = None
+        self.status = None
+        self.status_rect = None
     
-    # 显示游戏状态
-    try:
-        font = pygame.font.SysFont(None, 30)
-        if game.game_over:
-            if game.winner == 1:
-                text = font.render("玩家胜利! 按R重新开始", True, BLUE)
-            elif game.winner == 2:
-                text = font.render("AI胜利! 按R重新开始", True, BLUE)
-            else:
-                text = font.render("平局! 按R重新开始", True, BLUE)
-        else:
-            if game.current_player == 1:
-                text = font.render("玩家回合 (黑棋)", True, BLUE)
-            else:
-                text = font.render("AI思考中...", True, BLUE)
+    def cell_rect(self, r, c):
+        return pygame.Rect(MARGIN + c * GRID_SIZE - GRID_SIZE // 2,
+                           MARGIN + r * GRID_SIZE - GRID_SIZE // 2,
+                           GRID_SIZE, GRID_SIZE)
+    
+    def render_text(self, text):
+        if text not in self.text_cache:
+            self.text_cache[text] = self.font.render(text, True, BLUE)
+        return self.text_cache[text]
+    
+    def paint(self, rect):
+        """恢复 rect 内的背景，再画出其中的棋子、最后一步标记和状态文字"""
+        screen = self.surface
+        screen.set_clip(rect)
+        try:
+            screen.blit(self.background, rect, rect)
+            r0 = max(0, (rect.top - MARGIN) // GRID_SIZE)
+            r1 = min(BOARD_SIZE - 1, (rect.bottom - MARGIN) // GRID_SIZE + 1)
+            c0 = max(0, (rect.left - MARGIN) // GRID_SIZE)
+            c1 = min(BOARD_SIZE - 1, (rect.right - MARGIN) // GRID_SIZE + 1)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    center = (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE)
+                    if self.drawn[r][c] == 1:  # 黑棋
+                        pygame.draw.circle(screen, BLACK, center, GRID_SIZE // 2 - 2)
+                    elif self.drawn[r][c] == 2:  # 白棋
+                        pygame.draw.circle(screen, WHITE, center, GRID_SIZE // 2 - 2)
+                        pygame.draw.circle(screen, BLACK, center, GRID_SIZE // 2 - 2, 1)  # 白色棋子加黑色边框
+            # 标记最后一步
+            if self.drawn_last_move:
+                r, c = self.drawn_last_move
+                pygame.draw.circle(screen, RED, (MARGIN + c * GRID_SIZE, MARGIN + r * GRID_SIZE), 5)
+            if self.status_rect is not None and self.status_rect.colliderect(rect):
+                screen.blit(self.render_text(self.status), self.status_rect)
+        except pygame.error:
+            pass
+        finally:
+            screen.set_clip(None)
+    
+    def draw(self, game, status, full=False):
+        """把界面更新到 game 的当前状态，只提交变化的区域"""
+        dirty = []
+        if full:
+            dirty.append(self.surface.get_rect())
+        
+        changed = np.argwhere(self.drawn != game.board)
+        for r, c in changed:
+            dirty.append(self.cell_rect(r, c))
+        self.drawn[:] = game.board
+        
+        if game.last_move != self.drawn_last_move:
+            for move in (self.drawn_last_move, game.last_move):
+                if move:
+                    dirty.append(self.cell_rect(*move))
+            self.drawn_last_move = game.last_move
+        
+        if status != self.status:
+            text = self.render_text(status)
+            if self.status_rect is not None:
+                dirty.append(self.status_rect)
+            self.status = status
+            self.status_rect = text.get_rect(topleft=(WIDTH // 2 - text.get_width() // 2, 15))
+            dirty.append(self.status_rect)
         
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 15))
-    except pygame.error:
-        pass
+        if not dirty:
+            return
+        for rect in dirty:
+            self.paint(rect)
+        pygame.display.update(dirty)
 
-# 主游戏循环
+def status_text(game, thinking):
+    """当前的状态栏文字"""
+    if game.game_over:
+        if game.winner == 1:
+            return "玩家胜利! 按R重新开始"
+        elif game.winner == 2:
+            return "AI胜利! 按R重新开始"
+        return "平局! 按R重新开始"
+    if game.current_player == 1:
+        return "玩家回合 (黑棋)"
+    dots = "." * (pygame.time.get_ticks() // 300 % 4) if thinking else ""  # 思考中的动画
+    return "AI思考中" + dots
+
+# 主游戏循环：没有事件时阻塞等待，只在状态变化时重画
 def main():
     global game
+    worker = AIWorker(game.size)
+    renderer = BoardRenderer(screen)
+    game.recorder = GameRecordWriter(record_path(game.size), game.size)
+    renderer.draw(game, status_text(game, False), full=True)
     
     while True:
-        for event in pygame.event.get():
+        full = False
+        events = [pygame.event.wait()] + pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
+                worker.cancel()
+                game.recorder.close()
                 pygame.quit()
                 sys.exit()
             
+            if event.type == pygame.VIDEOEXPOSE:
+                full = True
+            
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:  # 按R重置游戏
+                if event.key == pygame.K_r:  # 按R重置游戏，中止正在进行的搜索
+                    worker.cancel()
                     game.reset()
             
             if not game.game_over and game.current_player == 1:  # 玩家回合
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    x, y = pygame.mouse.get_pos()
+                    x, y = event.pos
                     col = round((x - MARGIN) / GRID_SIZE)
                     row = round((y - MARGIN) / GRID_SIZE)
                     
                     if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
-                        if game.make_move(row, col):
-                            # 玩家移动后，如果是AI回合，AI立即移动
-                            if not game.game_over and game.current_player == 2:
-                                pygame.display.flip()  # 更新显示
-                                pygame.time.delay(300)  # 延迟一下，让玩家看到自己的落子
-                                game.ai_move()
+                        game.make_move(row, col)
         
-        # AI回合
+        # AI回合：在后台线程搜索，完成时线程发出 AI_DONE_EVENT 唤醒主循环
         if not game.game_over and game.current_player == 2:
-            game.ai_move()
+            result = worker.take_result()
+            if result is not None:
+                move, info, elapsed = result
+                if move:
+                    game.make_move(*move)
+                    print(f"AI思考时间: {elapsed:.2f}秒 ({info})")
+            elif not worker.busy():
+                worker.start(game)
+        
+        thinking = worker.busy()
+        pygame.time.set_timer(THINK_TICK_EVENT, 300 if thinking else 0)
         
         try:
-            draw_board()
-            pygame.display.flip()
+            renderer.draw(game, status_text(game, thinking), full)
         except pygame.error as e:
             print(f"渲染错误: {e}")
             pygame.quit()
             sys.exit(1)
-        
-        pygame.time.delay(50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,101 @@
+"""Zobrist 哈希与置换表（供 wuziqi.py / wenben.py 的搜索共用）"""
+import random
+import sys
+
+# 置换表条目类型
+EXACT = 0   # 精确值
+LOWER = 1   # 下界（发生β剪枝）
+UPPER = 2   # 上界（所有着法都不超过α）
+
+
+
+def _entry_bytes():
+    """一个满条目的内存占用（字节）：表中的指针 + 6元组 + 64位键 + 分数 + 着法元组
+    （深度、标志和代数是小整数，由解释器共享，不计入）"""
+    key = (1 << 63) | 1
+    value = 50003
+    move = (7, 7)
+    entry = (key, 6, EXACT, value, move, 0)
+    return (8 + sys.getsizeof(entry) + sys.getsizeof(key) + sys.getsizeof(value)
+            + sys.getsizeof(move))
+
+
+ENTRY_BYTES = _entry_bytes()
+
+
+class Zobrist:
+    """Zobrist 随机键表：每个(玩家, 格子)一个64位随机数"""
+
+    def __init__(self, size=15, seed=20240601):
+        rng = random.Random(seed)
+        self.size = size
+        # keys[player][r * size + c]，player 为 1 或 2，下标0留空
+        self.keys = [None] + [[rng.getrandbits(64) for _ in range(size * size)]
+                              for _ in range(2)]
+        # 轮到最大化一方（AI）走棋时异或上该键
+        self.side_key = rng.getrandbits(64)
+
+    def key(self, row, col, player):
+        return self.keys[player][row * self.size + col]
+
+    def hash_board(self, board):
+        """从头计算整个棋盘的哈希值"""
+        h = 0
+        size = self.size
+        for r in range(size):
+            for c in range(size):
+                p = board[r][c]
+                if p:
+                    h ^= self.keys[p][r * size + c]
+        return h
+
+
+class TranspositionTable:
+    """固定大小的置换表，深度优先替换，按内存上限分配槽位"""
+
+    def __init__(self, max_mb=16):
+        slots = max(1, int(max_mb * 1024 * 1024) // ENTRY_BYTES)
+        # 取不超过上限的2的幂，便于用掩码取下标
+        size = 1 << (slots.bit_length() - 1)
+        self.mask = size - 1
+        self.table = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def new_search(self):
+        """开始新一次 ai_move：旧条目仍可命中，但允许被任意深度替换"""
+        self.generation += 1
+
+    def clear(self):
+        self.table = [None] * len(self.table)
+        self.generation = 0
+        self.hits = 0
+        self.probes = 0
+
+    def probe(self, key):
+        """返回 (depth, flag, value, move)，未命中返回 None"""
+        self.probes += 1
+        entry = self.table[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        return None
+
+    def peek(self, key):
+        """与 probe 相同，但不计入命中率统计（用于还原主要变例等搜索以外的查询）"""
+        entry = self.table[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        index = key & self.mask
+        entry = self.table[index]
+        # 深度优先替换：空槽、旧一轮的条目或深度不小于原条目时才覆盖
+        if (entry is None or entry[5] != self.generation
+                or depth >= entry[1]):
+            self.table[index] = (key, depth, flag, value, move, self.generation)